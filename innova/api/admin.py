@@ -1,14 +1,80 @@
-from django.contrib import admin
+import re
+from django.contrib import admin, messages
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.contrib.admin.helpers import ActionForm
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import UserChangeForm, UserCreationForm
 from django import forms
 from phonenumber_field.formfields import SplitPhoneNumberField
 from .models import Movement, Meal, Program, Diet, User
+from .membership import bulk_update_membership
+from .pagination import EstimatedCountPaginator
 
-admin.site.register(Movement)
-admin.site.register(Meal)
-admin.site.register(Program)
-admin.site.register(Diet)
+def count_subquery(queryset, field):
+    # İlişkili satır sayısı; iki çoklu JOIN + COUNT(DISTINCT) satır çarpımına yol açardı
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(count=Count('pk')).values('count')
+    ), 0)
+
+@admin.register(Movement)
+class MovementAdmin(admin.ModelAdmin):
+    list_display = ('name', 'sets', 'reps')
+    search_fields = ('name__istartswith',)
+
+@admin.register(Meal)
+class MealAdmin(admin.ModelAdmin):
+    list_display = ('name', 'amount', 'unit', 'calories', 'protein', 'carbs', 'oil')
+    list_filter = ('unit',)
+    search_fields = ('name__istartswith',)
+
+@admin.register(Program)
+class ProgramAdmin(admin.ModelAdmin):
+    list_display = ('name', 'movement_count', 'member_count')
+    search_fields = ('name__istartswith',)
+    autocomplete_fields = ('movements',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _movement_count=count_subquery(Program.movements.through.objects, 'program'),
+            _member_count=count_subquery(User.objects, 'program'),
+        )
+
+    @admin.display(description='Hareket sayısı', ordering='_movement_count')
+    def movement_count(self, obj):
+        return obj._movement_count
+
+    @admin.display(description='Üye sayısı', ordering='_member_count')
+    def member_count(self, obj):
+        return obj._member_count
+
+@admin.register(Diet)
+class DietAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'total_calories', 'total_protein', 'total_carbs', 'total_oil', 'meal_count', 'member_count')
+    readonly_fields = ('total_calories', 'total_protein', 'total_carbs', 'total_oil')
+    search_fields = ('=total_calories',)
+    autocomplete_fields = ('meals',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _meal_count=count_subquery(Diet.meals.through.objects, 'diet'),
+            _member_count=count_subquery(User.objects, 'diet'),
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        # "1800 Kcal" gibi aramalar saklanan toplam kaloriyle eşleşir
+        calories = re.match(r'\s*(\d+)', search_term)
+        if calories:
+            return queryset.filter(total_calories=int(calories.group(1))), False
+        return queryset.none() if search_term.strip() else queryset, False
+
+    @admin.display(description='Yemek sayısı', ordering='_meal_count')
+    def meal_count(self, obj):
+        return obj._meal_count
+
+    @admin.display(description='Üye sayısı', ordering='_member_count')
+    def member_count(self, obj):
+        return obj._member_count
 
 class CustomUserCreationForm(UserCreationForm):
     phone_number = SplitPhoneNumberField(region="TR", help_text="Kullanıcı telefon numarası")
@@ -24,13 +90,78 @@ class CustomUserChangeForm(UserChangeForm):
         model = User
         fields = '__all__'
 
+class MembershipActionForm(ActionForm):
+    # Program/diyet id ile seçilir; seçim listesi tüm tabloyu sayfaya gömerdi
+    days = forms.IntegerField(label='Gün', min_value=1, required=False)
+    program = forms.IntegerField(label='Program id', min_value=1, required=False)
+    diet = forms.IntegerField(label='Diyet id', min_value=1, required=False)
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     form = CustomUserChangeForm
     add_form = CustomUserCreationForm
+    action_form = MembershipActionForm
+    actions = ['extend_membership', 'assign_program', 'assign_diet', 'clear_program', 'clear_diet']
+
+    def _action_data(self, request):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid():
+            self.message_user(request, 'Geçersiz işlem parametreleri.', messages.ERROR)
+            return None
+        return form.cleaned_data
+
+    def _assign(self, request, queryset, field, model, label):
+        # Atama için id zorunludur; kaldırmak için clear_* işlemleri kullanılır
+        data = self._action_data(request)
+        if data is None:
+            return
+        if not data[field]:
+            self.message_user(request, f'{label.capitalize()} id girin.', messages.ERROR)
+            return
+        target = model.objects.filter(pk=data[field]).first()
+        if target is None:
+            self.message_user(request, f'{data[field]} id\'li {label} bulunamadı.', messages.ERROR)
+            return
+        updated = bulk_update_membership(queryset, **{field: target})
+        self.message_user(request, f'{updated} kullanıcıya "{target}" atandı.', messages.SUCCESS)
+
+    @admin.action(description='Seçili üyeliklerin süresini uzat', permissions=['change'])
+    def extend_membership(self, request, queryset):
+        data = self._action_data(request)
+        if data is None:
+            return
+        if not data['days']:
+            self.message_user(request, 'Gün sayısı girin.', messages.ERROR)
+            return
+        updated = bulk_update_membership(queryset, extend_days=data['days'])
+        self.message_user(request, f'{updated} üyelik {data["days"]} gün uzatıldı.', messages.SUCCESS)
 
-    list_display = ('phone_number', 'first_name', 'last_name', 'is_staff')
+    @admin.action(description='Seçili kullanıcılara program ata', permissions=['change'])
+    def assign_program(self, request, queryset):
+        self._assign(request, queryset, 'program', Program, 'program')
+
+    @admin.action(description='Seçili kullanıcılara diyet ata', permissions=['change'])
+    def assign_diet(self, request, queryset):
+        self._assign(request, queryset, 'diet', Diet, 'diyet')
+
+    @admin.action(description='Seçili kullanıcıların programını kaldır', permissions=['change'])
+    def clear_program(self, request, queryset):
+        updated = bulk_update_membership(queryset, program=None)
+        self.message_user(request, f'{updated} kullanıcının programı kaldırıldı.', messages.SUCCESS)
+
+    @admin.action(description='Seçili kullanıcıların diyetini kaldır', permissions=['change'])
+    def clear_diet(self, request, queryset):
+        updated = bulk_update_membership(queryset, diet=None)
+        self.message_user(request, f'{updated} kullanıcının diyeti kaldırıldı.', messages.SUCCESS)
+
+    list_display = ('phone_number', 'first_name', 'last_name', 'membership_end', 'program', 'diet', 'is_staff')
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'groups')
+    list_select_related = ('program', 'diet')
+    autocomplete_fields = ('program', 'diet')
+    # Büyük tablolarda COUNT(*) yerine tahmin; tam sayım ikinci kez yapılmaz
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     fieldsets = (
         (None, {'fields': ('phone_number', 'password')}),
@@ -91,4 +222,10 @@ class UserAdmin(BaseUserAdmin):
     )
     
     search_fields = ('phone_number', 'first_name', 'last_name')
-    ordering = ('phone_number',)
\ No newline at end of file
+    ordering = ('phone_number',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # icontains yerine indeksli önek araması (bkz. UserQuerySet.search)
+        if not search_term.strip():
+            return queryset, False
+        return queryset.search(search_term), False
\ No newline at end of file
@@ -0,0 +1,156 @@
+import json
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.authtoken.models import Token
+from .renderers import FastJSONRenderer
+from .authentication import LoginBusy, aauthenticate, alogin, token_cache
+from .models import Movement, Meal, Program, Diet, User
+from .serializers import MovementSerializer, MealSerializer, ProgramSerializer, DietSerializer, UserSerializer, anested_versions
+from .throttling import CatalogReadThrottle, LoginThrottle
+from .views import ReadOnlyIfNotAdminPermission
+
+# ASGI (ör. uvicorn innova.asgi:application) altında thread tutmadan çalışan salt okunur liste/detay uçları.
+# Sayfalama id üzerinden anahtar kümesiyle yapılır: ?after=<son id>&page_size=N
+
+
+def throttled(render, wait):
+    # DRF Throttled yanıtıyla aynı gövde ve başlık
+    response = render({'detail': f'Request was throttled. Expected available in {wait} second{"" if wait == 1 else "s"}.'}, status=429)
+    response['Retry-After'] = str(wait)
+    return response
+
+
+class AsyncReadView(View):
+    queryset = None
+    serializer_class = None
+    permission = ReadOnlyIfNotAdminPermission()
+    throttle_class = CatalogReadThrottle
+    max_page_size = 500
+    chunk_size = 500
+    # İç içe serileştirilen sınıflar; sürümleri önceden (async) okunur, bkz. NestedMemoMixin
+    nested_serializers = ()
+
+    def get_queryset(self, user):
+        return self.queryset.all()
+
+    async def get_serializer_context(self):
+        return {'nested_versions': await anested_versions(*self.nested_serializers)}
+
+    async def get(self, request, pk=None):
+        request.user = await aauthenticate(request)
+        if request.user is None:
+            return self.render({'detail': 'Authentication credentials were not provided.'}, status=401)
+        if not self.permission.has_permission(request, self):
+            return self.render({'detail': 'You do not have permission to perform this action.'}, status=403)
+        throttle = self.throttle_class() if self.throttle_class else None
+        if throttle and not throttle.allow_request(request, self):
+            return throttled(self.render, throttle.wait())
+
+        queryset = self.get_queryset(request.user)
+        if pk is not None:
+            try:
+                obj = await queryset.aget(pk=pk)
+            except queryset.model.DoesNotExist:
+                return self.render({'detail': 'No %s matches the given query.' % queryset.model._meta.object_name}, status=404)
+            return self.render(self.serializer_class(obj, context=await self.get_serializer_context()).data)
+
+        try:
+            after = int(request.GET.get('after', 0))
+            page_size = min(int(request.GET.get('page_size', settings.REST_FRAMEWORK['PAGE_SIZE'])), self.max_page_size)
+        except ValueError:
+            return self.render({'detail': 'after and page_size must be integers.'}, status=400)
+        page_size = max(page_size, 1)
+
+        page = [
+            obj async for obj in queryset.filter(pk__gt=after).order_by('pk')[:page_size + 1].aiterator(chunk_size=self.chunk_size)
+        ]
+        next_url = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            query = request.GET.copy()
+            query['after'] = page[-1].pk
+            next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+        context = await self.get_serializer_context()
+        return self.render({'next': next_url, 'results': self.serializer_class(page, many=True, context=context).data})
+
+    def render(self, data, status=200):
+        return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+class AsyncMovementView(AsyncReadView):
+    queryset = Movement.objects.all()
+    serializer_class = MovementSerializer
+
+
+class AsyncMealView(AsyncReadView):
+    queryset = Meal.objects.all()
+    serializer_class = MealSerializer
+
+
+class AsyncProgramView(AsyncReadView):
+    queryset = Program.objects.prefetch_related('movements')
+    serializer_class = ProgramSerializer
+
+
+class AsyncDietView(AsyncReadView):
+    queryset = Diet.objects.for_serializer()
+    serializer_class = DietSerializer
+
+
+class AsyncUserView(AsyncReadView):
+    serializer_class = UserSerializer
+    nested_serializers = (ProgramSerializer, DietSerializer)
+    throttle_class = None
+
+    def get_queryset(self, user):
+        queryset = User.objects.with_membership_status().prefetch_related(
+            Prefetch('program', queryset=Program.objects.prefetch_related('movements')),
+            Prefetch('diet', queryset=Diet.objects.for_serializer()),
+        )
+        if user.is_staff:
+            return queryset
+        return queryset.filter(id=user.id)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncTokenView(View):
+    # obtain_auth_token ile aynı sözleşme (username + password -> {"token": ...}, JSON ya da form).
+    # Hash doğrulaması hash_pool'da yapılır; havuz doluysa 503 + Retry-After döner. Kullanıcının mevcut
+    # token'ı yeniden kullanılır ve token_cache'e yazılır; ilk kimlikli istek veritabanına gitmez.
+    retry_after = 1
+
+    async def post(self, request):
+        throttle = LoginThrottle()
+        if not throttle.allow_request(request, self):
+            return throttled(self.render, throttle.wait())
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                return self.render({'detail': 'JSON parse error.'}, status=400)
+            if not isinstance(data, dict):
+                return self.render({'non_field_errors': ['Invalid data. Expected a dictionary.']}, status=400)
+        else:
+            data = request.POST
+        errors = {name: ['This field is required.'] for name in ('username', 'password') if not data.get(name)}
+        if errors:
+            return self.render(errors, status=400)
+
+        try:
+            user = await alogin(str(data['username']), str(data['password']))
+        except LoginBusy:
+            response = self.render({'detail': 'Too many logins in progress, retry shortly.'}, status=503)
+            response['Retry-After'] = str(self.retry_after)
+            return response
+        if user is None:
+            return self.render({'non_field_errors': ['Unable to log in with provided credentials.']}, status=400)
+        token, _ = await Token.objects.aget_or_create(user=user)
+        await token_cache.aset(token.key, user, token)
+        return self.render({'token': token.key})
+
+    def render(self, data, status=200):
+        return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
@@ -0,0 +1,209 @@
+import asyncio
+import copy
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connections
+from innova.middleware import timed
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from .cache import LRUCache
+
+
+class TokenCache:
+    # token anahtarı -> (user, token). API_TOKEN_CACHE_BACKEND verilirse yalnızca paylaşılan Django cache
+    # kullanılır: çıkış/parola/is_active değişikliğindeki invalidate tüm worker'larda hemen geçerli olur.
+    # Verilmezse süreç içi LRU kullanılır; geçersiz kılma yalnızca o süreçte olur, diğerleri TTL'i bekler.
+    def __init__(self):
+        self.local = LRUCache(
+            maxsize=getattr(settings, 'API_TOKEN_CACHE_SIZE', 10_000),
+            ttl=getattr(settings, 'API_TOKEN_CACHE_TTL', 60),
+        )
+        self.backend = getattr(settings, 'API_TOKEN_CACHE_BACKEND', None)
+        self.shared_hits = 0
+
+    def _shared_key(self, key):
+        return 'api:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        if not self.backend:
+            return self._copy(self.local.get(key))
+        entry = caches[self.backend].get(self._shared_key(key))
+        if entry is not None:
+            self.shared_hits += 1
+        return self._copy(entry)
+
+    async def aget(self, key):
+        if not self.backend:
+            return self._copy(self.local.get(key))
+        entry = await caches[self.backend].aget(self._shared_key(key))
+        if entry is not None:
+            self.shared_hits += 1
+        return self._copy(entry)
+
+    def _copy(self, entry):
+        if entry is None:
+            return None
+        # Aynı nesneler eşzamanlı isteklerde paylaşılmasın
+        user, token = entry
+        user = copy.copy(user)
+        token = copy.copy(token)
+        token.user = user
+        return user, token
+
+    def set(self, key, user, token):
+        if self.backend:
+            caches[self.backend].set(self._shared_key(key), (user, token), self.local.ttl)
+        else:
+            self.local.set(key, (user, token))
+
+    async def aset(self, key, user, token):
+        if self.backend:
+            await caches[self.backend].aset(self._shared_key(key), (user, token), self.local.ttl)
+        else:
+            self.local.set(key, (user, token))
+
+    def invalidate(self, *keys):
+        if self.backend:
+            caches[self.backend].delete_many([self._shared_key(key) for key in keys])
+        for key in keys:
+            self.local.delete(key)
+
+    def clear(self):
+        self.local.clear()
+        self.shared_hits = 0
+
+    def stats(self):
+        return dict(self.local.stats(), shared_hits=self.shared_hits)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    # TokenAuthentication ile aynı davranır; token -> kullanıcı eşlemesini token_cache üzerinden okur.
+    def authenticate(self, request):
+        with timed('auth'):
+            return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return user, token
+
+
+async def aauthenticate(request):
+    # Async görünümler için TokenAuthentication + oturum eşdeğeri; kullanıcıyı ya da None döndürür
+    header = request.headers.get('Authorization', '').split()
+    if not header or header[0].lower() != CachedTokenAuthentication.keyword.lower():
+        user = await request.auser()
+        return user if user.is_authenticated else None
+    if len(header) != 2:
+        return None
+    key = header[1]
+    cached = await token_cache.aget(key)
+    if cached is not None:
+        return cached[0]
+    try:
+        token = await Token.objects.select_related('user').aget(key=key)
+    except Token.DoesNotExist:
+        return None
+    if not token.user.is_active:
+        return None
+    await token_cache.aset(key, token.user, token)
+    return token.user
+
+
+class LoginBusy(Exception):
+    pass
+
+
+class HashPool:
+    # Parola doğrulamasını istek thread'i/olay döngüsü dışında, sınırlı bir thread havuzunda çalıştırır.
+    # Eşzamanlı en fazla `workers` hash hesaplanır; `queue_limit` kadarı sırada bekler, fazlası LoginBusy alır.
+    # PBKDF2 (hashlib) GIL'i bıraktığı için hesaplamalar diğer isteklerle paralel ilerler.
+    def __init__(self, workers, queue_limit):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='login-hash')
+        # Hasher yükseltmeleri tek thread'de, yanıt gönderildikten sonra yapılır
+        self.rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='login-rehash')
+        self.pending = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self._lock = threading.Lock()
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise LoginBusy
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def rehash(self, pk, password, encoded):
+        return self.rehash_executor.submit(self._rehash, pk, password, encoded)
+
+    def _rehash(self, pk, password, encoded):
+        try:
+            # Parola bu arada değiştiyse dokunulmaz; update() sinyal göndermez, token önbelleği korunur
+            if get_user_model()._default_manager.filter(pk=pk, password=encoded).update(password=make_password(password)):
+                with self._lock:
+                    self.rehashed += 1
+        finally:
+            connections.close_all()
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'pending': self.pending,
+            'rejected': self.rejected,
+            'rehashed': self.rehashed,
+        }
+
+
+hash_pool = HashPool(
+    workers=getattr(settings, 'API_LOGIN_CONCURRENCY', None) or min(4, os.cpu_count() or 1),
+    queue_limit=getattr(settings, 'API_LOGIN_QUEUE_LIMIT', 200),
+)
+
+
+def _verify(password, encoded):
+    # (parola doğru mu, hasher yükseltmesi gerekiyor mu); yeni hash burada hesaplanmaz
+    upgrade = []
+    if encoded is None:
+        # Kullanıcı yoksa da bir hash hesaplanır (ModelBackend gibi): yanıt süresi kullanıcı varlığını sızdırmaz
+        make_password(password)
+        return False, False
+    valid = check_password(password, encoded, setter=lambda raw_password: upgrade.append(True))
+    return valid, bool(upgrade)
+
+
+async def alogin(username, password):
+    # ModelBackend.authenticate eşdeğeri; hash havuzda doğrulanır. Kullanıcıyı ya da None döndürür.
+    User = get_user_model()
+    try:
+        user = await User._default_manager.filter(**{User.USERNAME_FIELD: username}).afirst()
+    except (ValidationError, ValueError):
+        user = None
+    with timed('auth'):
+        valid, upgrade = await hash_pool.run(_verify, password, user.password if user else None)
+    if not valid or not user.is_active:
+        return None
+    if upgrade:
+        hash_pool.rehash(user.pk, password, user.password)
+    return user
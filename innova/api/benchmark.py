@@ -0,0 +1,351 @@
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from .authentication import token_cache
+from .fastpath import compile_mapper
+from .renderers import FastJSONRenderer
+from .serializers import MovementSerializer, MealSerializer, UserSerializer
+from .throttling import limiter
+from .models import Movement, Meal, Program, Diet, User
+from . import versioning
+
+# Tam ölçekte üretilen veri hacmi; --scale ile orantılı küçültülür
+VOLUMES = {
+    'movements': 500,
+    'programs': 50,
+    'meals': 5_000,
+    'diets': 1_000,
+    'users': 100_000,
+}
+
+STAFF_PHONE = '+905000000001'
+MEMBER_PHONE = '+905000000002'
+PASSWORD = 'benchmark-pass'
+
+# İstek başına izin verilen en fazla SQL sorgusu. Sayfa boyutundan bağımsız olmalıdır;
+# aşılması N+1 gerilemesi demektir.
+QUERY_BUDGETS = {
+    'movements-list': 3,
+    'movements-detail': 3,
+    'meals-list': 3,
+    'meals-detail': 3,
+    'programs-list': 4,
+    'programs-detail': 4,
+    'diets-list': 4,
+    'diets-detail': 4,
+    'users-list': 5,
+    'users-detail': 5,
+    'users-list-member': 5,
+    'users-expiring': 2,
+    'users-me': 5,
+    'token': 4,
+}
+
+
+def generate(scale=1.0, seed=42, batch_size=1000):
+    rng = random.Random(seed)
+    counts = {name: max(1, int(volume * scale)) for name, volume in VOLUMES.items()}
+    today = date.today()
+
+    with transaction.atomic():
+        movements = Movement.objects.bulk_create(
+            [
+                Movement(
+                    name=f'Hareket {i}', video=f'https://youtu.be/{i:011d}',
+                    sets=rng.randint(2, 5), reps=rng.randint(6, 15),
+                )
+                for i in range(counts['movements'])
+            ],
+            batch_size=batch_size,
+        )
+        programs = Program.objects.bulk_create(
+            [Program(name=f'Program {i}') for i in range(counts['programs'])], batch_size=batch_size,
+        )
+        Program.movements.through.objects.bulk_create(
+            [
+                Program.movements.through(program_id=program.pk, movement_id=movement.pk)
+                for program in programs
+                for movement in rng.sample(movements, min(len(movements), rng.randint(5, 15)))
+            ],
+            batch_size=batch_size,
+        )
+
+        meals = Meal.objects.bulk_create(
+            [
+                Meal(
+                    name=f'Yemek {i}', amount=rng.randint(1, 300), unit=rng.choice(['piece', 'gram', 'liter']),
+                    protein=rng.randint(0, 40), carbs=rng.randint(0, 80), oil=rng.randint(0, 30),
+                    calories=rng.randint(20, 800),
+                )
+                for i in range(counts['meals'])
+            ],
+            batch_size=batch_size,
+        )
+        diets = Diet.objects.bulk_create([Diet() for _ in range(counts['diets'])], batch_size=batch_size)
+        Diet.meals.through.objects.bulk_create(
+            [
+                Diet.meals.through(diet_id=diet.pk, meal_id=meal.pk)
+                for diet in diets
+                for meal in rng.sample(meals, min(len(meals), rng.randint(10, 30)))
+            ],
+            batch_size=batch_size,
+        )
+        Diet.objects.refresh_totals()
+
+        # Tek bir hash tüm üyeler için kullanılır; 100k PBKDF2 hesaplamak üretimi dakikalarca sürdürür
+        password = make_password(PASSWORD)
+        users = [
+            User(
+                phone_number=STAFF_PHONE, first_name='Bench', last_name='Staff', password=password,
+                is_staff=True, membership_end=today + timedelta(days=365),
+            ),
+            User(
+                phone_number=MEMBER_PHONE, first_name='Bench', last_name='Member', password=password,
+                membership_end=today + timedelta(days=30), program=rng.choice(programs), diet=rng.choice(diets),
+            ),
+        ]
+        users += [
+            User(
+                phone_number=f'+90532{i:07d}', first_name=f'Üye{i}', last_name='Test', password=password,
+                height=Decimal(rng.randint(150, 200)), weight=Decimal(rng.randint(45, 120)),
+                membership_end=today + timedelta(days=rng.randint(-365, 365)),
+                program=rng.choice(programs), diet=rng.choice(diets),
+            )
+            for i in range(counts['users'])
+        ]
+        User.objects.bulk_create(users, batch_size=batch_size)
+        versioning.bump(Movement, Meal, Program, Diet)
+    return counts
+
+
+def _endpoints(rng):
+    movement_ids = list(Movement.objects.values_list('pk', flat=True))
+    meal_ids = list(Meal.objects.values_list('pk', flat=True))
+    program_ids = list(Program.objects.values_list('pk', flat=True))
+    diet_ids = list(Diet.objects.values_list('pk', flat=True))
+    user_ids = list(User.objects.values_list('pk', flat=True)[:10_000])
+    member_id = User.objects.get(phone_number=MEMBER_PHONE).pk
+
+    def detail(prefix, ids):
+        return lambda: f'/api/{prefix}/{rng.choice(ids)}/'
+
+    return [
+        ('movements-list', 'staff', 'get', lambda: '/api/movements/'),
+        ('movements-detail', 'staff', 'get', detail('movements', movement_ids)),
+        ('meals-list', 'staff', 'get', lambda: '/api/meals/'),
+        ('meals-detail', 'staff', 'get', detail('meals', meal_ids)),
+        ('programs-list', 'staff', 'get', lambda: '/api/programs/'),
+        ('programs-detail', 'staff', 'get', detail('programs', program_ids)),
+        ('diets-list', 'staff', 'get', lambda: '/api/diets/'),
+        ('diets-detail', 'staff', 'get', detail('diets', diet_ids)),
+        ('users-list', 'staff', 'get', lambda: '/api/users/'),
+        ('users-detail', 'staff', 'get', detail('users', user_ids)),
+        ('users-list-member', 'member', 'get', lambda: '/api/users/'),
+        ('users-expiring', 'staff', 'get', lambda: '/api/users/expiring/?days=7'),
+        ('users-me', 'member', 'get', lambda: '/api/users/me/'),
+        ('token', None, 'post', lambda: '/api/token/'),
+    ]
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def ok(status):
+    return 200 <= status < 300 or status == 304
+
+
+@contextmanager
+def unthrottled():
+    # Ölçüm kısıtlamaya takılmasın: tüm kapsamlar kapatılır, önceki kovalar boşaltılır
+    limiter.clear()
+    with override_settings(API_THROTTLE_RATES=dict.fromkeys(settings.API_THROTTLE_RATES)):
+        yield
+
+
+@unthrottled()
+def run(iterations=50, seed=42, only=None):
+    rng = random.Random(seed)
+    token_cache.clear()
+    clients = {}
+    for role, phone in (('staff', STAFF_PHONE), ('member', MEMBER_PHONE)):
+        token, _ = Token.objects.get_or_create(user=User.objects.get(phone_number=phone))
+        clients[role] = APIClient(HTTP_AUTHORIZATION=f'Token {token.key}')
+    anonymous = APIClient()
+
+    results = {}
+    for name, role, method, url in _endpoints(rng):
+        if only and name not in only:
+            continue
+        client = clients.get(role, anonymous)
+        iterations_for = max(3, iterations // 10) if name == 'token' else iterations
+
+        def call():
+            if name == 'token':
+                return client.post(url(), {'username': MEMBER_PHONE, 'password': PASSWORD})
+            return getattr(client, method)(url())
+
+        timings, queries, statuses = [], 0, set()
+        for _ in range(iterations_for):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = call()
+                timings.append(time.perf_counter() - started)
+            queries = max(queries, len(captured.captured_queries))
+            statuses.add(response.status_code)
+
+        # Bellek ölçümü ayrı bir çağrıda yapılır; tracemalloc zamanlamaları bozar
+        tracemalloc.start()
+        statuses.add(call().status_code)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        budget = QUERY_BUDGETS.get(name)
+        results[name] = {
+            'requests': iterations_for,
+            'status': sorted(statuses),
+            'failed': not all(ok(status) for status in statuses),
+            'p50_ms': round(_percentile(timings, 50) * 1000, 3),
+            'p95_ms': round(_percentile(timings, 95) * 1000, 3),
+            'p99_ms': round(_percentile(timings, 99) * 1000, 3),
+            'mean_ms': round(statistics.mean(timings) * 1000, 3),
+            'throughput_rps': round(len(timings) / sum(timings), 1),
+            'max_queries': queries,
+            'query_budget': budget,
+            'over_budget': budget is not None and queries > budget,
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+    return results
+
+
+def _fill(model, rows, make):
+    missing = rows - model.objects.count()
+    if missing > 0:
+        model.objects.bulk_create([make(i) for i in range(missing)], batch_size=1000)
+
+
+def serialization(rows=10_000, repeat=5):
+    # Aynı liste için serializer + JSONRenderer ile .values() + derlenmiş eşleyici + FastJSONRenderer
+    # karşılaştırılır (sorgu dahil). Eksik satırlar geçici olarak üretilir ve sonunda geri alınır.
+    targets = [
+        ('meals', Meal.objects.order_by('id'), MealSerializer()),
+        ('movements', Movement.objects.order_by('id'), MovementSerializer()),
+        ('users', User.objects.with_membership_status().order_by('id'), UserSerializer(expand=[])),
+    ]
+    results = {}
+    with transaction.atomic():
+        rng = random.Random(0)
+        _fill(Meal, rows, lambda i: Meal(
+            name=f'Öğün {i}', amount=100, unit='gram', protein=rng.randint(0, 40),
+            carbs=rng.randint(0, 80), oil=rng.randint(0, 30), calories=rng.randint(50, 900),
+        ))
+        _fill(Movement, rows, lambda i: Movement(name=f'Hareket {i}', video=f'https://youtu.be/{i:011d}', sets=3, reps=10))
+        _fill(User, rows, lambda i: User(
+            phone_number=f'+90555{i:07d}', first_name='Ad', last_name='Soyad',
+            height=Decimal('175.50'), weight=Decimal('72.25'), birth_date=date(1990, 1, 1) + timedelta(days=i % 9000),
+            membership_end=date.today() + timedelta(days=i % 400 - 100),
+        ))
+
+        for name, queryset, serializer in targets:
+            queryset = queryset[:rows]
+            mapper = compile_mapper(serializer, ('birth_date', 'membership_end') if name == 'users' else ())
+            columns = dict.fromkeys(mapper.columns + tuple(queryset.query.annotations))
+
+            def standard():
+                return JSONRenderer().render(type(serializer)(queryset.all(), many=True, **(
+                    {'expand': []} if name == 'users' else {}
+                )).data)
+
+            def fast():
+                return FastJSONRenderer().render(mapper.map_rows(queryset.values(*columns), columns))
+
+            timings = {}
+            for label, func in (('standard', standard), ('fast', fast)):
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    body = func()
+                    samples.append(time.perf_counter() - started)
+                timings[label] = (min(samples), body)
+            results[name] = {
+                'rows': queryset.count(),
+                'standard_ms': round(timings['standard'][0] * 1000, 1),
+                'fast_ms': round(timings['fast'][0] * 1000, 1),
+                'speedup': round(timings['standard'][0] / timings['fast'][0], 2),
+                'identical': timings['standard'][1] == timings['fast'][1],
+            }
+        transaction.set_rollback(True)
+    return results
+
+
+# api/diets/plan/ için hedef yanıt süresi
+PLANNER_BUDGET_MS = 200
+
+
+@unthrottled()
+def planner(meals=10_000, repeat=20, seed=42):
+    # Katalog `meals` yemeğe tamamlanır ve planlayıcı ucu farklı hedeflerle çağrılır; ilk (soğuk) çağrı
+    # katalog yüklemesini içerir ve ayrıca raporlanır. Üretilen veri sonunda geri alınır.
+    rng = random.Random(seed)
+    targets = [
+        {'calories': 2000, 'protein': 150, 'carbs': 200, 'oil': 60},
+        {'calories': 1500, 'protein': 120},
+        {'calories': 2800, 'protein': 180, 'carbs': 320, 'oil': 80, 'max_meals': 8},
+        {'calories': 1800, 'units': ['gram'], 'exclude': [1, 2, 3]},
+    ]
+    with transaction.atomic():
+        def meal(i):
+            protein, carbs, oil = rng.randint(0, 50), rng.randint(0, 100), rng.randint(0, 40)
+            return Meal(
+                name=f'Öğün {i}', amount=100, unit=rng.choice(['piece', 'gram', 'liter']), protein=protein,
+                carbs=carbs, oil=oil, calories=4 * protein + 4 * carbs + 9 * oil + rng.randint(-20, 20),
+            )
+        _fill(Meal, meals, meal)
+        versioning.bump(Meal)
+        staff = User.objects.create(phone_number='+905000000099', first_name='Plan', last_name='Bench', is_staff=True)
+        client = APIClient()
+        client.force_authenticate(staff)
+
+        started = time.perf_counter()
+        response = client.post('/api/diets/plan/', targets[0], format='json')
+        cold = time.perf_counter() - started
+        timings, scores, statuses = [], [], {response.status_code}
+        for i in range(repeat):
+            started = time.perf_counter()
+            response = client.post('/api/diets/plan/', targets[i % len(targets)], format='json')
+            timings.append(time.perf_counter() - started)
+            statuses.add(response.status_code)
+            if ok(response.status_code):
+                scores.append(response.data['candidates'][0]['score'])
+        transaction.set_rollback(True)
+    return {
+        'meals': meals,
+        'requests': repeat,
+        'status': sorted(statuses),
+        'failed': not all(ok(status) for status in statuses),
+        'cold_ms': round(cold * 1000, 1),
+        'p50_ms': round(_percentile(timings, 50) * 1000, 1),
+        'p95_ms': round(_percentile(timings, 95) * 1000, 1),
+        'budget_ms': PLANNER_BUDGET_MS,
+        'within_budget': _percentile(timings, 95) * 1000 <= PLANNER_BUDGET_MS,
+        'mean_best_score': round(statistics.mean(scores), 4) if scores else None,
+    }
+
+
+def dump(meta, results, stream):
+    # Tek write: management komutunun stdout sarmalayıcısı her write'a satır sonu ekler
+    stream.write(json.dumps({'meta': meta, 'endpoints': results}, indent=2, ensure_ascii=False) + '\n')
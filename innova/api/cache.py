@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LRUCache:
+    # Süreç içi, boyutu sınırlı ve TTL'li basit LRU önbellek. hit/miss sayaçlarını tutar.
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else None,
+        }
+
+
+class ResponseCache:
+    # Render edilmiş yanıt gövdelerini Django cache'te tutar. Anahtarlar veri sürümünü içerdiğinden
+    # yazmalar eski girdileri kendiliğinden geçersiz kılar; eski girdiler TTL ile düşer.
+    def __init__(self, alias='default', ttl=3600):
+        self.alias = alias
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def _key(self, etag, encoding=None):
+        return 'api:response:' + etag.strip('"') + (f':{encoding}' if encoding else '')
+
+    def get(self, etag, encoding=None):
+        # encoding='gzip': aynı gövdenin sıkıştırılmış hali; her önbellek girdisi en fazla bir kez sıkıştırılır
+        entry = caches[self.alias].get(self._key(etag, encoding))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.bytes_saved += len(entry[0])
+        return entry
+
+    def set(self, etag, content, headers, encoding=None):
+        caches[self.alias].set(self._key(etag, encoding), (content, headers), self.ttl)
+
+    def clear(self):
+        self.hits = self.misses = self.bytes_saved = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else None,
+            'bytes_saved': self.bytes_saved,
+        }
+
+
+response_cache = ResponseCache(
+    alias=getattr(settings, 'API_RESPONSE_CACHE_BACKEND', 'default'),
+    ttl=getattr(settings, 'API_RESPONSE_CACHE_TTL', 3600),
+)
+
+
+# İç içe Program/Diet serileştirmeleri için istekler arası önbellek (bkz. NestedMemoMixin); 0 ise kapalı
+nested_cache = LRUCache(
+    maxsize=getattr(settings, 'API_NESTED_CACHE_SIZE', 0),
+    ttl=getattr(settings, 'API_NESTED_CACHE_TTL', None),
+) if getattr(settings, 'API_NESTED_CACHE_SIZE', 0) else None
+
+
+# /api/users/me/ için kullanıcı başına birleştirilmiş profil belgesi. Her istekte tek sorguluk damgayla
+# doğrulandığından süreçler arası geçersizleştirme gerekmez.
+profile_cache = LRUCache(
+    maxsize=getattr(settings, 'API_PROFILE_CACHE_SIZE', 10_000),
+    ttl=getattr(settings, 'API_PROFILE_CACHE_TTL', None),
+)
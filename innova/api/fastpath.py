@@ -0,0 +1,137 @@
+import decimal
+from types import SimpleNamespace
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# .values() satırlarından serializer çıktısının aynısını üreten okuma yolu.
+# Her serializer alan kümesi için bir kez derlenen eşleyici, satırı ModelSerializer ile
+# bayt bayt aynı sözlüğe çevirir; iç içe serializer içeren alan kümeleri desteklenmez (None döner).
+
+# DB'den gelen değeri to_representation'ın aynen döndürdüğü alan tipleri
+PASSTHROUGH = (serializers.IntegerField, serializers.BooleanField, serializers.ChoiceField)
+TEXT = (serializers.CharField, serializers.URLField, serializers.EmailField)
+
+_mappers = {}
+
+
+def _decimal(field):
+    # DecimalField.to_representation'ın yerelleştirmesiz hali; bağlam ve üs bir kez hazırlanır
+    if field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        quantized = value.quantize(exponent, rounding=rounding, context=context)
+        return '{:f}'.format(quantized) if coerce_to_string else quantized
+    return convert
+
+
+def _date(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is not None and output_format.lower() == ISO_8601:
+        return lambda value: value.isoformat()
+    return field.to_representation
+
+
+def _converter(field, model_field):
+    if isinstance(field, PASSTHROUGH) or (isinstance(field, TEXT) and not hasattr(model_field, 'from_db_value')):
+        return None
+    if isinstance(field, TEXT):
+        return str
+    if type(field) is serializers.DecimalField:
+        return _decimal(field)
+    if type(field) is serializers.DateField:
+        return _date(field)
+    return field.to_representation
+
+
+def _column_plan(model, field):
+    source = field.source
+    if isinstance(field, serializers.ReadOnlyField):
+        # Model özelliği (ör. User.age): satırdaki sütunlarla hesaplanır
+        prop = getattr(model, source, None)
+        if isinstance(prop, property):
+            return None, None, prop.fget
+    try:
+        model_field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete or model_field.many_to_many:
+        return None
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # values('program') program_id döndürür
+        return source, None, None
+    if isinstance(field, (serializers.RelatedField, serializers.BaseSerializer)):
+        return None
+    return source, _converter(field, model_field), None
+
+
+def _build(plan):
+    # Satırı tek bir sözlük ifadesiyle kuran fonksiyon üretilir; alan başına döngü ve çağrı maliyeti kalkar
+    namespace = {'SimpleNamespace': SimpleNamespace}
+    items = []
+    for index, (name, source, convert, prop) in enumerate(plan):
+        if prop is not None:
+            namespace[f'p{index}'] = prop
+            expr = f'p{index}(instance)'
+        else:
+            expr = f'row[{source!r}]'
+        if convert is not None:
+            namespace[f'c{index}'] = convert
+            expr = f'None if (v{index} := {expr}) is None else c{index}(v{index})'
+        items.append(f'{name!r}: {expr}')
+    lines = ['def mapper(row):']
+    if any(prop is not None for *_, prop in plan):
+        lines.append('    instance = SimpleNamespace(**row)')
+    lines.append('    return {' + ', '.join(items) + '}')
+    exec('\n'.join(lines), namespace)
+    return namespace['mapper']
+
+
+class RowMapper:
+    def __init__(self, columns, plan):
+        self.columns = columns
+        self.plan = plan
+        self.map = _build(plan)
+        # Tüm alanlar dönüşümsüz ve sütun sırası alan sırasıyla aynıysa .values() satırı zaten çıktıdır
+        self.identity = columns == tuple(name for name, *_ in plan) and all(
+            name == source and convert is None and prop is None for name, source, convert, prop in plan
+        )
+
+    def map_rows(self, rows, columns):
+        if self.identity and tuple(columns) == self.columns:
+            return list(rows)
+        return list(map(self.map, rows))
+
+    def __call__(self, row):
+        return self.map(row)
+
+
+def compile_mapper(serializer, extra_columns=()):
+    # serializer: fields/expand uygulanmış örnek; extra_columns: hesaplanan alanların okuduğu sütunlar
+    model = serializer.Meta.model
+    readable = [(name, field) for name, field in serializer.fields.items() if not field.write_only]
+    key = (type(serializer), tuple((name, type(field)) for name, field in readable), tuple(extra_columns))
+    if key in _mappers:
+        return _mappers[key]
+
+    plan, columns = [], list(extra_columns)
+    for name, field in readable:
+        entry = _column_plan(model, field)
+        if entry is None:
+            _mappers[key] = None
+            return None
+        source, convert, prop = entry
+        if prop is None and source not in columns:
+            columns.append(source)
+        plan.append((name, source, convert, prop))
+    mapper = _mappers[key] = RowMapper(tuple(columns), tuple(plan))
+    return mapper
@@ -0,0 +1,35 @@
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+
+class OrderingFilter(filters.OrderingFilter):
+    # view.ordering_aliases ile hesaplanan alanlar indeksli bir sütuna eşlenir,
+    # örn. remaining_days -> membership_end (aynı sıralama, imleç sayfalamasıyla uyumlu)
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        aliases = getattr(view, 'ordering_aliases', {})
+        fields = [
+            ('-' if field.startswith('-') else '') + aliases.get(field.lstrip('-'), field.lstrip('-'))
+            for field in fields
+        ]
+        return super().remove_invalid_fields(queryset, fields, view, request)
+
+
+class MembershipFilter(filters.BaseFilterBackend):
+    # ?active=true|false ve ?expires_within=N (gün)
+    def filter_queryset(self, request, queryset, view):
+        active = request.query_params.get('active')
+        if active is not None:
+            if active.lower() not in ('true', 'false', '1', '0'):
+                raise ValidationError({'active': ['Must be true or false.']})
+            queryset = queryset.active(active.lower() in ('true', '1'))
+
+        expires_within = request.query_params.get('expires_within')
+        if expires_within is not None:
+            try:
+                days = int(expires_within)
+            except ValueError:
+                raise ValidationError({'expires_within': ['A valid integer is required.']})
+            if days < 0:
+                raise ValidationError({'expires_within': ['Must be zero or greater.']})
+            queryset = queryset.expiring_within(days)
+        return queryset
@@ -0,0 +1,85 @@
+import sys
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+from api import benchmark
+from api.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Tohumlu veriyle tüm router uçlarını ve api/token/ ucunu süreç içinde ölçer; '
+        'p50/p95/p99, verim, sorgu sayısı ve tepe belleği JSON olarak yazar. '
+        'Sorgu bütçesi aşılırsa hata ile çıkar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Veri hacmi çarpanı (1.0 = 100k üye).')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--endpoint', action='append', dest='endpoints', help='Yalnızca bu uçları çalıştır.')
+        parser.add_argument('--output', help='JSON sonuç dosyası (varsayılan: stdout).')
+        parser.add_argument(
+            '--serialization-rows', type=int, default=0,
+            help='Ayrıca bu kadar satırlık listede serializer ile hızlı okuma yolunu karşılaştır (ör. 10000).',
+        )
+        parser.add_argument(
+            '--planner-meals', type=int, default=0,
+            help='Ayrıca bu kadar yemeklik katalogda diyet planlayıcı ucunu ölç (ör. 10000).',
+        )
+        parser.add_argument('--keepdb', action='store_true', help='Benchmark veritabanını sonraki çalıştırmalar için sakla.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        # Geliştirme veritabanı kirlenmesin diye ayrı bir test veritabanı kullanılır
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            counts = None
+            if not User.objects.exists():
+                self.stderr.write('Veri üretiliyor...')
+                counts = benchmark.generate(scale=options['scale'], seed=options['seed'])
+            results = benchmark.run(iterations=options['iterations'], seed=options['seed'], only=options['endpoints'])
+            serialization = planner = None
+            if options['serialization_rows']:
+                serialization = benchmark.serialization(rows=options['serialization_rows'])
+            if options['planner_meals']:
+                planner = benchmark.planner(meals=options['planner_meals'], seed=options['seed'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        meta = {
+            'timestamp': timezone.now().isoformat(),
+            'seed': options['seed'],
+            'scale': options['scale'],
+            'generated': counts,
+            'iterations': options['iterations'],
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': sys.version.split()[0],
+        }
+        if serialization is not None:
+            meta['serialization'] = serialization
+        if planner is not None:
+            meta['planner'] = planner
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                benchmark.dump(meta, results, stream)
+        else:
+            benchmark.dump(meta, results, self.stdout)
+
+        failed = [name for name, result in results.items() if result['failed']]
+        if planner is not None and planner['failed']:
+            failed.append('planner')
+        if failed:
+            raise CommandError('Başarısız yanıt: ' + ', '.join(
+                f"{name} {(planner if name == 'planner' else results[name])['status']}" for name in failed
+            ))
+        if planner is not None and not planner['within_budget']:
+            raise CommandError(f"Planlayıcı p95 {planner['p95_ms']} ms > {planner['budget_ms']} ms")
+        over = [name for name, result in results.items() if result['over_budget']]
+        if over:
+            raise CommandError('Sorgu bütçesi aşıldı: ' + ', '.join(
+                f"{name} ({results[name]['max_queries']}/{results[name]['query_budget']})" for name in over
+            ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from api.transfer import FORMATS, RESOURCES, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Bir tabloyu CSV ya da JSONL olarak akışla dışa aktarır; tablo belleğe alınmaz.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(RESOURCES))
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', help='Çıktı dosyası (varsayılan: stdout).')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        lines = export_lines(RESOURCES[options['resource']], options['format'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as stream:
+                stream.writelines(lines)
+        else:
+            for chunk in lines:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,32 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from api.transfer import FORMATS, RESOURCES, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'CSV ya da JSONL dosyasını parça parça doğrulayıp bulk_create ile içe aktarır. '
+        'Hatalı satırlar atlanır ve satır numarasıyla raporlanır.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(RESOURCES))
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, help='Varsayılan: dosya uzantısı.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if fmt not in FORMATS:
+            raise CommandError(f'Bilinmeyen biçim: {fmt!r}. --format ile {" ya da ".join(FORMATS)} verin.')
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            result = import_rows(RESOURCES[options['resource']], read_rows(stream, fmt), batch_size=options['batch_size'])
+
+        for error in result.errors:
+            messages = '; '.join(f'{field}: {" ".join(map(str, errors))}' for field, errors in error['errors'].items())
+            self.stderr.write(f"satır {error['line']}: {messages}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f'... ve {result.error_count - len(result.errors)} hata daha')
+        self.stdout.write(self.style.SUCCESS(f'{result.created} kayıt eklendi, {result.error_count} satır hatalı.'))
+        if result.error_count and not result.created:
+            raise CommandError('Hiçbir satır içe aktarılamadı.')
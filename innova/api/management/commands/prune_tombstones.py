@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api import sync
+
+
+class Command(BaseCommand):
+    help = 'Saklama süresini (API_SYNC_TOMBSTONE_DAYS) geçmiş silme kayıtlarını temizler.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None)
+
+    def handle(self, *args, **options):
+        deleted = sync.prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'{deleted} silme kaydı temizlendi.'))
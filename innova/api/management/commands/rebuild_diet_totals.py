@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.models import Diet
+
+
+class Command(BaseCommand):
+    help = 'Diyetlerin saklanan kalori/protein/karbonhidrat/yağ toplamlarını yemeklerden yeniden hesaplar.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+        while True:
+            ids = list(
+                Diet.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                updated += Diet.objects.filter(pk__in=ids).refresh_totals()
+            last_pk = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f'{updated} diyet güncellendi.'))
@@ -0,0 +1,73 @@
+import threading
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from rest_framework.authtoken.models import Token
+from api.models import User
+
+
+def run_writers(writers, iterations):
+    # Her yazıcı kendi kullanıcısı için token yenileme ve profil güncellemesi yapar (giriş + PATCH yükü).
+    # Yalnızca burada oluşturulan kullanıcılar silinir (token'ları da cascade ile gider).
+    users, created = [], []
+    for index in range(writers):
+        user, is_new = User.objects.get_or_create(
+            phone_number=f'+90500{index:07d}',
+            defaults={'first_name': 'Stres', 'last_name': str(index)},
+        )
+        users.append(user)
+        if is_new:
+            created.append(user.pk)
+    errors = []
+    barrier = threading.Barrier(writers)
+
+    def write(user):
+        try:
+            barrier.wait()
+            for step in range(iterations):
+                Token.objects.filter(user=user).delete()
+                Token.objects.create(user=user)
+                user.weight = Decimal(60 + step % 40)
+                user.save(update_fields=['weight'])
+        except Exception as error:
+            errors.append(f'{type(error).__name__}: {error}')
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=write, args=(user,)) for user in users]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    User.objects.filter(pk__in=created).delete()
+    return errors, elapsed
+
+
+class Command(BaseCommand):
+    help = 'N paralel yazıcıyla veritabanı kilit hatalarını ölçer.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=16)
+        parser.add_argument('--iterations', type=int, default=50)
+
+    def handle(self, *args, **options):
+        writers, iterations = options['writers'], options['iterations']
+        # Yazıcılar token silip yeniden oluşturduğu için geliştirme veritabanına dokunulmaz
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.stdout.write(f'journal_mode={cursor.fetchone()[0]}')
+            errors, elapsed = run_writers(writers, iterations)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        writes = writers * iterations * 3
+        self.stdout.write(f'{writers} yazıcı, {writes} yazma, {elapsed:.2f} sn ({writes / elapsed:.0f} yazma/sn)')
+        if errors:
+            raise CommandError(f'{len(errors)} hata: {errors[0]}')
+        self.stdout.write(self.style.SUCCESS('Kilit hatası yok.'))
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+from django.db import transaction
+from django.db.models import DateField, ExpressionWrapper, F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from .authentication import token_cache
+
+UNSET = object()
+
+
+def bulk_update_membership(queryset, extend_days=None, program=UNSET, diet=UNSET):
+    # Üyelik uzatma ve program/diyet atamasını tek bir UPDATE ile yapar; etkilenen satır sayısını döndürür.
+    # User.clean() ve nesne başına save() çalışmaz, bu yüzden token önbelleği ve updated_at (senkronizasyon, /me damgası) burada güncellenir.
+    changes = {}
+    if extend_days:
+        # Bitiş tarihi olmayan üyeler bugünden itibaren uzatılır
+        changes['membership_end'] = ExpressionWrapper(
+            Coalesce(F('membership_end'), Value(date.today())) + timedelta(days=extend_days),
+            output_field=DateField(),
+        )
+    if program is not UNSET:
+        changes['program'] = program
+    if diet is not UNSET:
+        changes['diet'] = diet
+    if not changes:
+        return 0
+    changes['updated_at'] = timezone.now()
+
+    with transaction.atomic():
+        keys = list(Token.objects.filter(user__in=queryset.values('pk')).values_list('key', flat=True))
+        updated = queryset.update(**changes)
+    token_cache.invalidate(*keys)
+    return updated
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:38
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_diet_totals(apps, schema_editor):
+    Diet = apps.get_model('api', 'Diet')
+    through = Diet.meals.through.objects.filter(diet_id=OuterRef('pk')).values('diet_id')
+    Diet.objects.update(**{
+        f'total_{field}': Coalesce(
+            Subquery(through.annotate(value=Sum(f'meal__{field}')).values('value')),
+            Value(0),
+        )
+        for field in ('calories', 'protein', 'carbs', 'oil')
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='diet',
+            name='total_calories',
+            field=models.IntegerField(default=0, editable=False, help_text='Toplam kalori (kcal)'),
+        ),
+        migrations.AddField(
+            model_name='diet',
+            name='total_carbs',
+            field=models.IntegerField(default=0, editable=False, help_text='Toplam karbonhidrat (gram)'),
+        ),
+        migrations.AddField(
+            model_name='diet',
+            name='total_oil',
+            field=models.IntegerField(default=0, editable=False, help_text='Toplam yağ (gram)'),
+        ),
+        migrations.AddField(
+            model_name='diet',
+            name='total_protein',
+            field=models.IntegerField(default=0, editable=False, help_text='Toplam protein (gram)'),
+        ),
+        migrations.RunPython(fill_diet_totals, migrations.RunPython.noop),
+    ]
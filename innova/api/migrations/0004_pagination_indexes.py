@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_diet_totals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='meal',
+            name='name',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='movement',
+            name='name',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='program',
+            name='name',
+            field=models.CharField(db_index=True, max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='membership_end',
+            field=models.DateField(db_index=True, help_text='Üyelik bitiş tarihi', null=True),
+        ),
+    ]
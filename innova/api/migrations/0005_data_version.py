@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:41
+
+from django.db import migrations, models
+
+
+def seed_versions(apps, schema_editor):
+    DataVersion = apps.get_model('api', 'DataVersion')
+    for label in ('api.movement', 'api.meal', 'api.program', 'api.diet'):
+        DataVersion.objects.get_or_create(label=label)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('label', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Veri sürümü',
+                'verbose_name_plural': 'Veri sürümleri',
+            },
+        ),
+        migrations.RunPython(seed_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_user_name_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Silinen kayıt',
+                'verbose_name_plural': 'Silinen kayıtlar',
+            },
+        ),
+        migrations.AddField(
+            model_name='diet',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Son değişiklik zamanı'),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Son değişiklik zamanı'),
+        ),
+        migrations.AddField(
+            model_name='movement',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Son değişiklik zamanı'),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Son değişiklik zamanı'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Son değişiklik zamanı'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_sync_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Measurement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('measured_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('height', models.DecimalField(blank=True, decimal_places=2, help_text='Boy (cm)', max_digits=5, null=True)),
+                ('weight', models.DecimalField(blank=True, decimal_places=2, help_text='Kilo (kg)', max_digits=5, null=True)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='measurements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Ölçüm',
+                'verbose_name_plural': 'Ölçümler',
+                'indexes': [models.Index(fields=['user', 'measured_at'], name='api_measurement_user_time_idx')],
+            },
+        ),
+    ]
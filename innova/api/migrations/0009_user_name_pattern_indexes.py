@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# PostgreSQL'de varsayılan (ör. tr_TR) sıralamalı indeks LIKE 'önek%' aramasında kullanılamaz;
+# UserQuerySet.search için text_pattern_ops ile ayrı ifade indeksleri. Diğer veritabanlarında işlem yapılmaz.
+INDEXES = {
+    'api_user_first_name_pattern_idx': 'first_name',
+    'api_user_last_name_pattern_idx': 'last_name',
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, column in INDEXES.items():
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON api_user (LOWER({column}) text_pattern_ops)')
+    schema_editor.execute('CREATE INDEX IF NOT EXISTS api_user_phone_pattern_idx ON api_user (phone_number varchar_pattern_ops)')
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in (*INDEXES, 'api_user_phone_pattern_idx'):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_measurements'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
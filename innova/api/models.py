@@ -1,8 +1,13 @@
-from django.db import models
-from datetime import date
+import re
+import sys
+from django.db import connections, models
+from django.db.models import Case, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Lower
+from datetime import date, timedelta
 from django.core.validators import BaseValidator
 from phonenumber_field.modelfields import PhoneNumberField
 from django.contrib.auth.models import AbstractUser, UserManager
+from django.utils import timezone
 
 class MinValueValidator(BaseValidator):
     message = "Bu değer %(limit_value)s değerinden büyük veya eşit olmalıdır."
@@ -13,10 +18,11 @@ class MinValueValidator(BaseValidator):
 
 # Create your models here.
 class Movement(models.Model):
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, db_index=True)
     video = models.URLField(max_length=200, help_text='YouTube video linki')
     sets = models.IntegerField(default=3, help_text='Set sayısı', validators=[MinValueValidator(1)])
     reps = models.IntegerField(default=12, help_text='Tekrar sayısı', validators=[MinValueValidator(1)])
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, help_text='Son değişiklik zamanı')
 
     def __str__(self):
         return self.name
@@ -26,7 +32,7 @@ class Movement(models.Model):
         verbose_name_plural = 'Hareketler'
 
 class Meal(models.Model):
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, db_index=True)
     amount = models.IntegerField()
     unit = models.CharField(
         max_length=10,
@@ -41,6 +47,7 @@ class Meal(models.Model):
     carbs = models.IntegerField(default=0, help_text='Karbonhidrat miktarı (gram)')
     oil = models.IntegerField(default=0, help_text='Yağ miktarı (gram)')
     calories = models.IntegerField(default=0, help_text='Kalori miktarı (kcal)')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, help_text='Son değişiklik zamanı')
 
     def __str__(self):
         return self.name
@@ -50,8 +57,9 @@ class Meal(models.Model):
         verbose_name_plural = 'Yemekler'
 
 class Program(models.Model):
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, db_index=True)
     movements = models.ManyToManyField(Movement, help_text='Birden fazla seçmek için CTRL tuşuna basılı tutun.')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, help_text='Son değişiklik zamanı')
     
     def __str__(self):
         return self.name
@@ -60,27 +68,47 @@ class Program(models.Model):
         verbose_name = 'Program'
         verbose_name_plural = 'Programlar'
 
+DIET_TOTAL_FIELDS = {
+    'total_calories': 'calories',
+    'total_protein': 'protein',
+    'total_carbs': 'carbs',
+    'total_oil': 'oil',
+}
+
+class DietQuerySet(models.QuerySet):
+    def refresh_totals(self):
+        # Saklanan toplamları tek bir UPDATE ile yeniden yazar
+        through = Diet.meals.through.objects.filter(diet_id=OuterRef('pk')).values('diet_id')
+        return self.update(updated_at=timezone.now(), **{
+            total: Coalesce(
+                Subquery(through.annotate(value=Sum(f'meal__{field}')).values('value')),
+                Value(0),
+            )
+            for total, field in DIET_TOTAL_FIELDS.items()
+        })
+
+    def for_serializer(self):
+        return self.prefetch_related('meals')
+
 class Diet(models.Model):
     
     meals = models.ManyToManyField(Meal, help_text='Birden fazla seçmek için CTRL tuşuna basılı tutun.')
+    # Yemeklerden türetilir, api.signals tarafından güncel tutulur
+    total_calories = models.IntegerField(default=0, editable=False, help_text='Toplam kalori (kcal)')
+    total_protein = models.IntegerField(default=0, editable=False, help_text='Toplam protein (gram)')
+    total_carbs = models.IntegerField(default=0, editable=False, help_text='Toplam karbonhidrat (gram)')
+    total_oil = models.IntegerField(default=0, editable=False, help_text='Toplam yağ (gram)')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, help_text='Son değişiklik zamanı')
+
+    objects = DietQuerySet.as_manager()
+
     @property
     def name(self):
-        total_calories = sum(meal.calories for meal in self.meals.all())
-        return f"{total_calories} Kcal Diyet"
-    @property
-    def total_calories(self):
-        return sum(meal.calories for meal in self.meals.all())
-    @property
-    def total_protein(self):
-        return sum(meal.protein for meal in self.meals.all())
-        
-    @property
-    def total_carbs(self):
-        return sum(meal.carbs for meal in self.meals.all())
-        
-    @property
-    def total_oil(self):
-        return sum(meal.oil for meal in self.meals.all())
+        return f"{self.total_calories} Kcal Diyet"
+
+    def refresh_totals(self):
+        Diet.objects.filter(pk=self.pk).refresh_totals()
+        self.refresh_from_db(fields=list(DIET_TOTAL_FIELDS))
     
     def __str__(self):
         return self.name
@@ -89,7 +117,84 @@ class Diet(models.Model):
         verbose_name = 'Diyet'
         verbose_name_plural = 'Diyetler'
 
-class CustomUserManager(UserManager):
+class UserQuerySet(models.QuerySet):
+    def with_membership_status(self):
+        # active / remaining_days değerlerini veritabanında hesaplar
+        today = date.today()
+        return self.annotate(
+            _active=Case(
+                When(membership_end__gte=today, then=Value(True)),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+            _remaining=ExpressionWrapper(
+                F('membership_end') - Value(today, output_field=models.DateField()),
+                output_field=models.DurationField(),
+            ),
+        )
+
+    def active(self, active=True):
+        # membership_end indeksi üzerinden aralık sorgusu
+        today = date.today()
+        if active:
+            return self.filter(membership_end__gte=today)
+        return self.filter(Q(membership_end__lt=today) | Q(membership_end__isnull=True))
+
+    def profile_stamp(self, pk):
+        # /api/users/me/ önbelleğinin geçerlilik damgası: kullanıcı, program ve diyetin updated_at'i ile program
+        # hareketlerinin ve diyet yemeklerinin en son değişiklik zamanı. Hareket/yemek çıkarmaları program/diyetin
+        # kendi updated_at'ini günceller. Önbellek isabetinde tek iş bu sorgudur; ORM'in iç içe alt sorguları
+        # derlemesi sorgunun kendisinden pahalı olduğundan SQL elle kurulur. Değerler yalnızca ETag'e girer.
+        connection = connections[self.db]
+        q = connection.ops.quote_name
+        user, program, diet = (model._meta.db_table for model in (User, Program, Diet))
+        movements, meals = Program.movements.through._meta.db_table, Diet.meals.through._meta.db_table
+        sql = (
+            f'SELECT u.{q("updated_at")}, u.{q("program_id")}, p.{q("updated_at")}, u.{q("diet_id")}, d.{q("updated_at")}, '
+            f'(SELECT MAX(m.{q("updated_at")}) FROM {q(movements)} pm INNER JOIN {q(Movement._meta.db_table)} m '
+            f'ON m.{q("id")} = pm.{q("movement_id")} WHERE pm.{q("program_id")} = u.{q("program_id")}), '
+            f'(SELECT MAX(m.{q("updated_at")}) FROM {q(meals)} dm INNER JOIN {q(Meal._meta.db_table)} m '
+            f'ON m.{q("id")} = dm.{q("meal_id")} WHERE dm.{q("diet_id")} = u.{q("diet_id")}) '
+            f'FROM {q(user)} u LEFT OUTER JOIN {q(program)} p ON p.{q("id")} = u.{q("program_id")} '
+            f'LEFT OUTER JOIN {q(diet)} d ON d.{q("id")} = u.{q("diet_id")} WHERE u.{q("id")} = %s'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [pk])
+            return cursor.fetchone()
+
+    def expiring_within(self, days):
+        today = date.today()
+        return self.filter(membership_end__range=(today, today + timedelta(days=days)))
+
+    def search(self, term):
+        # İndeksli önek araması: telefon için phone_number, ad/soyad için lower() ifade indeksleri üzerinde.
+        # Her kelime adın ya da soyadın başıyla eşleşmelidir ("ali yıl" -> Ali Yılmaz). LIKE/icontains tam
+        # tablo taraması yapar; PostgreSQL'de önek LIKE'ı text_pattern_ops indekslerine (0009) iner.
+        term = term.strip()
+        digits = re.sub(r'\D', '', term)
+        if digits and not re.sub(r'[\d\s()+-]', '', term):
+            if term.startswith('+'):
+                prefix = '+' + digits
+            elif digits.startswith('0'):
+                prefix = '+90' + digits[1:]
+            elif digits.startswith('90'):
+                prefix = '+' + digits
+            else:
+                prefix = '+90' + digits
+            return self.filter(self._prefix('phone_number', prefix))
+        return self.alias(_first=Lower('first_name'), _last=Lower('last_name')).filter(*(
+            self._prefix('_first', word) | self._prefix('_last', word) for word in term.lower().split()
+        ))
+
+    def _prefix(self, field, prefix):
+        condition = Q(**{f'{field}__startswith': prefix})
+        if connections[self.db].vendor == 'sqlite' and ord(prefix[-1]) < sys.maxunicode:
+            # SQLite LIKE'ı ifade indekslerinde kullanmaz; ikili sıralamada [önek, sonraki önek) aralığı
+            # indeksten okunur, LIKE yalnızca bu satırlara uygulanır
+            condition &= Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix[:-1] + chr(ord(prefix[-1]) + 1)})
+        return condition
+
+class CustomUserManager(UserManager.from_queryset(UserQuerySet)):
     def _create_user(self, phone_number, password, **extra_fields):
         if not phone_number:
             raise ValueError('The phone number must be set')
@@ -139,9 +244,10 @@ class User(AbstractUser):
     birth_date = models.DateField(null=True, blank=True, editable=True)
     blood_type = models.CharField(max_length=3, choices=BLOOD_TYPES, null=True, blank=True, editable=True)
     membership_start = models.DateField(help_text='Üyelik başlangıç tarihi', default=date.today, blank=False, editable=True)
-    membership_end = models.DateField(help_text='Üyelik bitiş tarihi', null=True, blank=False, editable=True)
+    membership_end = models.DateField(help_text='Üyelik bitiş tarihi', null=True, blank=False, editable=True, db_index=True)
     program = models.ForeignKey('Program', on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Program')
     diet = models.ForeignKey('Diet', on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Diyet')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, help_text='Son değişiklik zamanı')
     
     def clean(self):
         import re
@@ -164,6 +270,8 @@ class User(AbstractUser):
 
     @property
     def active(self):
+        if hasattr(self, '_active'):
+            return self._active
         today = date.today()
         return today <= self.membership_end if self.membership_end else False
 
@@ -176,6 +284,8 @@ class User(AbstractUser):
 
     @property
     def remaining_days(self):
+        if getattr(self, '_remaining', None) is not None:
+            return self._remaining.days
         if not self.membership_end:
             return None
         today = date.today()
@@ -188,6 +298,57 @@ class User(AbstractUser):
     class Meta:
         verbose_name = 'Kullanıcı'
         verbose_name_plural = 'Kullanıcılar'
+        indexes = [
+            # Admin'deki ad/soyad önek aramaları için (bkz. UserQuerySet.search)
+            models.Index(Lower('first_name'), name='api_user_first_name_lower_idx'),
+            models.Index(Lower('last_name'), name='api_user_last_name_lower_idx'),
+        ]
 
     objects = CustomUserManager()
 
+class DataVersion(models.Model):
+    # Model başına sürüm damgası; her yazmada artırılır (bkz. api.versioning)
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
+
+    class Meta:
+        verbose_name = 'Veri sürümü'
+        verbose_name_plural = 'Veri sürümleri'
+
+
+class Tombstone(models.Model):
+    # Silinen nesnelerin kaydı; delta senkronizasyonu istemcilere silmeleri bu tablodan bildirir
+    label = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.label}#{self.object_id}"
+
+    class Meta:
+        verbose_name = 'Silinen kayıt'
+        verbose_name_plural = 'Silinen kayıtlar'
+
+
+class Measurement(models.Model):
+    # Boy/kilo geçmişi; yalnızca eklenir. Profil PATCH'inde gönderilen değerler yazılır (bkz. UserSerializer.update).
+    # FK'nin tek sütunlu indeksi yerine (user, measured_at) bileşik indeksi hem kullanıcı filtresini hem de
+    # zaman aralığı taramasını karşılar.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='measurements', db_index=False)
+    measured_at = models.DateTimeField(default=timezone.now)
+    height = models.DecimalField(max_digits=5, decimal_places=2, help_text='Boy (cm)', null=True, blank=True)
+    weight = models.DecimalField(max_digits=5, decimal_places=2, help_text='Kilo (kg)', null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user} @ {self.measured_at:%Y-%m-%d}"
+
+    class Meta:
+        verbose_name = 'Ölçüm'
+        verbose_name_plural = 'Ölçümler'
+        indexes = [
+            models.Index(fields=['user', 'measured_at'], name='api_measurement_user_time_idx'),
+        ]
@@ -0,0 +1,147 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+import json
+from django.db import connections
+from django.db.models import F, Max, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+def estimate_count(queryset):
+    # Filtresiz büyük tablolarda COUNT(*) yerine ucuz bir tahmin kullanır; (sayı, tahmin_mi) döner
+    threshold = getattr(settings, 'API_COUNT_ESTIMATE_THRESHOLD', 100_000)
+    if not queryset.query.where:
+        estimate = _table_estimate(queryset)
+        if estimate is not None and estimate >= threshold:
+            return estimate, True
+    return queryset.count(), False
+
+
+def _table_estimate(queryset):
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return row[0]
+    # Otomatik artan birincil anahtarın en büyük değeri indeks üzerinden okunur
+    return queryset.model._default_manager.using(queryset.db).aggregate(value=Max('pk'))['value'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    # Django admin için; filtresiz büyük tablolarda sayfa sayısı tahmine dayanır
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)[0]
+
+
+class KeysetPagination(CursorPagination):
+    # Sıralama alanına her zaman birincil anahtar eklenir; imleç (değer, pk) çiftidir ve eşit değerlerde
+    # offset gerekmez. NULL değerler sıralamanın sonundadır (geri sayfalarken başında); imleç koşulu
+    # NULL bölümüne isnull dalıyla geçer.
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    count_query_param = 'with_count'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        pk = queryset.model._meta.pk.name
+        first = ordering[0]
+        if first.lstrip('-') in ('pk', pk):
+            return (first,)
+        return (first, ('-' if first.startswith('-') else '') + pk)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.total_count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.total_count = estimate_count(queryset)
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor is not None else None
+        nullable = queryset.model._meta.get_field(self.ordering[0].lstrip('-')).null
+        queryset = queryset.order_by(*self._order_by(reverse, nullable))
+        if position is not None:
+            queryset = queryset.filter(self._after(json.loads(position), reverse, nullable))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = None
+        if len(results) > len(self.page):
+            following = self._get_position_from_instance(results[-1], self.ordering)
+
+        # Konumlar tekil olduğundan DRF'nin offset'li bağlantı üretimi her zaman offset=0 verir
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = True, position
+            self.has_previous, self.previous_position = following is not None, following
+        else:
+            self.has_next, self.next_position = following is not None, following
+            self.has_previous, self.previous_position = position is not None, position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _order_by(self, reverse, nullable):
+        expressions = []
+        for index, field in enumerate(self.ordering):
+            expression = F(field.lstrip('-'))
+            desc = field.startswith('-') != reverse
+            nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+            expressions.append(
+                (expression.desc if desc else expression.asc)(**(nulls if index == 0 and nullable else {}))
+            )
+        return expressions
+
+    def _after(self, position, reverse, nullable):
+        # Gezinme sırasında imleçten sonra gelen satırlar
+        names = [field.lstrip('-') for field in self.ordering]
+        lookup = '__lt' if self.ordering[0].startswith('-') != reverse else '__gt'
+        if len(names) == 1:
+            return Q(**{names[0] + lookup: position[0]})
+        (name, pk), (value, pk_value) = names, position
+        nulls_after = nullable and not reverse
+        if value is None:
+            condition = Q(**{f'{name}__isnull': True, pk + lookup: pk_value})
+            return condition if nulls_after else condition | Q(**{f'{name}__isnull': False})
+        condition = Q(**{name + lookup: value}) | Q(**{name: value, pk + lookup: pk_value})
+        if nulls_after:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is not None and cursor.position is not None:
+            try:
+                position = json.loads(cursor.position)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = [
+            instance[field.lstrip('-')] if isinstance(instance, dict) else getattr(instance, field.lstrip('-'))
+            for field in ordering
+        ]
+        return json.dumps([None if value is None else str(value) for value in values], separators=(',', ':'))
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.total_count is not None:
+            count, estimated = self.total_count
+            response['X-Total-Count'] = str(count)
+            if estimated:
+                response['X-Total-Count-Estimated'] = 'true'
+        return response
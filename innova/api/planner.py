@@ -0,0 +1,144 @@
+import numpy as np
+from .cache import LRUCache
+from .models import Meal
+from . import versioning
+
+# Makro hedefli diyet planlayıcı. Yemek kataloğu (id, birim, kalori/protein/karbonhidrat/yağ) NumPy dizilerine
+# alınır ve Meal veri sürümüyle önbelleğe konur. Arama iki aşamalıdır:
+#   1. Işın araması: her adımda ışındaki her kümeye katalogdaki her yemek eklenir; B x n puan matrisi
+#      besin başına tek vektör işlemiyle hesaplanır, en iyi `beam_width` farklı küme sonraki adıma geçer.
+#   2. Sınırlı yerel arama: en iyi adaylarda tek yemek değiştirme hamleleri, iyileşme kalmayana kadar
+#      ya da `swap_rounds` tur boyunca denenir.
+# Puan, verilen hedeflerden göreli mutlak sapmaların toplamıdır; verilmeyen hedefler puana girmez.
+
+NUTRIENTS = ('calories', 'protein', 'carbs', 'oil')
+
+_catalogs = LRUCache(maxsize=4)
+
+
+class Catalog:
+    def __init__(self, ids, units, values):
+        self.ids = ids
+        self.units = units
+        self.values = values
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows):
+        # rows: (id, unit, calories, protein, carbs, oil)
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        units = np.array([row[1] for row in rows], dtype=object)
+        values = np.array([row[2:] for row in rows], dtype=np.float32).reshape(len(rows), len(NUTRIENTS))
+        return cls(ids, units, values)
+
+
+def load_catalog():
+    key, _ = versioning.current(Meal)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        catalog = Catalog.from_rows(list(Meal.objects.order_by('pk').values_list('pk', 'unit', *NUTRIENTS)))
+        _catalogs.set(key, catalog)
+    return catalog
+
+
+def _weights(targets):
+    target = np.array([targets.get(name) or 0 for name in NUTRIENTS], dtype=np.float32)
+    weights = np.array([
+        0.0 if targets.get(name) is None else 1.0 / max(targets[name], 1) for name in NUTRIENTS
+    ], dtype=np.float32)
+    return target, weights
+
+
+def _scores(bases, values, target, weights):
+    # bases (B x 4) ile values (n x 4) toplamlarının puanı (B x n); B x n x 4 ara dizi oluşturulmaz
+    scores = np.zeros((len(bases), len(values)), dtype=values.dtype)
+    for k in np.flatnonzero(weights):
+        part = np.add.outer(bases[:, k] - target[k], values[:, k])
+        np.abs(part, out=part)
+        part *= weights[k]
+        scores += part
+    return scores
+
+
+def _local_search(values, selected, total, target, weights, rounds):
+    selected = list(selected)
+    score = float(np.abs(total - target) @ weights)
+    for _ in range(rounds):
+        # selected[p] yerine j konursa: taban toplam - values[selected[p]] + values[j]
+        bases = total - values[selected]
+        scores = _scores(bases, values, target, weights)
+        scores[:, selected] = np.inf
+        position, meal = np.unravel_index(np.argmin(scores), scores.shape)
+        if scores[position, meal] >= score - 1e-6:
+            break
+        total = bases[position] + values[meal]
+        score = float(scores[position, meal])
+        selected[position] = int(meal)
+    return tuple(sorted(selected)), total, score
+
+
+def plan(catalog, targets, min_meals=1, max_meals=6, exclude=(), units=None, results=3,
+         beam_width=32, swap_rounds=4):
+    # targets: {'calories': 2000, 'protein': 150, ...}; en az calories verilmelidir.
+    # En iyi `results` farklı yemek kümesini puana göre sıralı döndürür.
+    mask = np.ones(len(catalog), dtype=bool)
+    if exclude:
+        mask &= ~np.isin(catalog.ids, list(exclude))
+    if units:
+        mask &= np.isin(catalog.units, list(units))
+    candidates = np.flatnonzero(mask)
+    max_meals = min(max_meals, len(candidates))
+    if not len(candidates) or min_meals > max_meals:
+        return []
+    values = catalog.values[candidates]
+    target, weights = _weights(targets)
+    count = len(candidates)
+
+    beam, sums = [()], np.zeros((1, len(NUTRIENTS)), dtype=np.float32)
+    finished = {}
+    for depth in range(1, max_meals + 1):
+        scores = _scores(sums, values, target, weights)
+        for row, selected in enumerate(beam):
+            scores[row, list(selected)] = np.inf
+        flat = scores.ravel()
+        keep = min(beam_width * depth * 2, flat.size)
+        best = np.argpartition(flat, keep - 1)[:keep]
+        best = best[np.argsort(flat[best], kind='stable')]
+
+        next_beam, next_sums, seen = [], [], set()
+        for index in best:
+            if not np.isfinite(flat[index]):
+                break
+            row, meal = divmod(int(index), count)
+            selected = tuple(sorted(beam[row] + (meal,)))
+            if selected in seen:
+                continue
+            seen.add(selected)
+            next_beam.append(selected)
+            next_sums.append(sums[row] + values[meal])
+            if depth >= min_meals:
+                finished[selected] = float(flat[index])
+            if len(next_beam) == beam_width:
+                break
+        if not next_beam:
+            break
+        beam, sums = next_beam, np.array(next_sums, dtype=np.float32)
+
+    improved = {}
+    for selected in sorted(finished, key=finished.get)[:results * 3]:
+        selected, total, score = _local_search(
+            values, selected, values[list(selected)].sum(axis=0), target, weights, swap_rounds,
+        )
+        improved[selected] = (score, total)
+
+    ranked = sorted(improved.items(), key=lambda item: item[1][0])[:results]
+    return [
+        {
+            'meal_ids': [int(catalog.ids[candidates[i]]) for i in selected],
+            'totals': {name: int(round(value)) for name, value in zip(NUTRIENTS, total)},
+            'score': round(score, 4),
+        }
+        for selected, (score, total) in ranked
+    ]
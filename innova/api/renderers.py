@@ -0,0 +1,28 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# datetime/dataclass DRF encoder'ının biçimiyle yazılsın diye orjson'a bırakılmaz
+OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    # orjson kuruluysa onunla, değilse DRF JSONRenderer ile yazar. Çıktı JSONRenderer'ın
+    # sıkıştırılmış (indent'siz) çıktısıyla aynıdır; indent istenirse ya da orjson'un
+    # yazmadığı bir tip (Decimal, datetime, 64 bit üstü tamsayı vb.) gelirse standart yola düşer.
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, option=OPTIONS)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer ile aynı: U+2028/U+2029 JavaScript'te satır sonu sayılır
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -1,36 +1,201 @@
 from rest_framework import serializers
-from .models import Movement, Meal, Program, Diet, User
+from django.db import transaction
+from .models import Movement, Meal, Program, Diet, User, Measurement
 from django.contrib.auth.hashers import make_password, check_password
+from innova.middleware import timed
+from .cache import nested_cache
+from . import timeseries, versioning
 
-class MovementSerializer(serializers.ModelSerializer):
+class TimedDataMixin:
+    # Üst seviye serileştirme süresi Server-Timing'e "serialize" olarak yazılır
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+class DynamicFieldsMixin:
+    # fields: döndürülecek alan adları; expand: iç içe serileştirilecek ilişkiler.
+    # expand verilmezse expandable_fields eskisi gibi iç içe döner, verilirse listede olmayanlar id olarak döner.
+    expandable_fields = []
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if expand is not None:
+            for name in self.expandable_fields:
+                if name not in expand and name in self.fields:
+                    many = isinstance(self.fields[name], serializers.ListSerializer)
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class NestedMemoMixin:
+    # İç içe kullanıldığında (ör. UserSerializer.program) aynı nesne bir yanıtta bir kez serileştirilir.
+    # Anahtar (model, pk, veri sürümü, alanlar); nested_cache açıksa sonuç istekler arasında da paylaşılır.
+    # version_models çıktıyı etkileyen tüm modelleri listelemelidir. Serileştirme sırasında sorgu atılmaz
+    # (async görünümlerde de çalışır): sürüm anahtarları görünümde nested_versions/anested_versions ile
+    # okunup context['nested_versions'] olarak verilir; verilmezse yalnızca istek içi memo kullanılır.
+    version_models = ()
+
+    def to_representation(self, instance):
+        if self.root is self or (self.parent is self.root and isinstance(self.parent, serializers.ListSerializer)):
+            return super().to_representation(instance)
+        memo = self.context.setdefault('_nested_memo', {})
+        version = self.context.get('nested_versions', {}).get(type(self))
+        key = (self.Meta.model._meta.label, instance.pk, version, type(self).__name__, tuple(self.fields))
+        if key in memo:
+            return memo[key]
+        shared = nested_cache is not None and version is not None
+        data = nested_cache.get(key) if shared else None
+        if data is None:
+            data = super().to_representation(instance)
+            if shared:
+                nested_cache.set(key, data)
+        memo[key] = data
+        return data
+
+
+def nested_versions(*serializer_classes):
+    if nested_cache is None:
+        return {}
+    return {cls: versioning.current(*cls.version_models)[0] for cls in serializer_classes}
+
+
+async def anested_versions(*serializer_classes):
+    if nested_cache is None:
+        return {}
+    return {cls: (await versioning.acurrent(*cls.version_models))[0] for cls in serializer_classes}
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
+class BulkListSerializer(TimedListSerializer):
+    batch_size = 500
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return model.objects.bulk_create([model(**attrs) for attrs in validated_data], batch_size=self.batch_size)
+
+class MovementSerializer(DynamicFieldsMixin, TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = Movement
         fields = ['id', 'name', 'video', 'sets', 'reps']
+        list_serializer_class = BulkListSerializer
 
-class MealSerializer(serializers.ModelSerializer):
+class MealSerializer(DynamicFieldsMixin, TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = Meal
         fields = ['id', 'name', 'amount', 'unit', 'protein', 'carbs', 'oil', 'calories']
+        list_serializer_class = BulkListSerializer
+
+class ProgramMovementsSerializer(serializers.Serializer):
+    add = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    remove = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
 
-class ProgramSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        # Tüm id'ler tek sorguda doğrulanır
+        ids = set(attrs['add']) | set(attrs['remove'])
+        missing = ids - set(Movement.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        if missing:
+            raise serializers.ValidationError({'movements': [f'Invalid pk "{pk}" - object does not exist.' for pk in sorted(missing)]})
+        return attrs
+
+class ProgramSerializer(NestedMemoMixin, DynamicFieldsMixin, TimedDataMixin, serializers.ModelSerializer):
     movements = MovementSerializer(many=True, read_only=True)
+    expandable_fields = ['movements']
+    version_models = (Program, Movement)
 
     class Meta:
         model = Program
         fields = ['id', 'name', 'movements']
+        list_serializer_class = TimedListSerializer
 
-class DietSerializer(serializers.ModelSerializer):
+class DietSerializer(NestedMemoMixin, DynamicFieldsMixin, TimedDataMixin, serializers.ModelSerializer):
     meals = MealSerializer(many=True, read_only=True)
     total_calories = serializers.ReadOnlyField()
     total_protein = serializers.ReadOnlyField()
     total_carbs = serializers.ReadOnlyField()
     total_oil = serializers.ReadOnlyField()
+    expandable_fields = ['meals']
+    version_models = (Diet, Meal)
 
     class Meta:
         model = Diet
         fields = ['id', 'name', 'meals', 'total_calories', 'total_protein', 'total_carbs', 'total_oil']
+        list_serializer_class = TimedListSerializer
+
+class DietPlanSerializer(serializers.Serializer):
+    # Hedefler günlük toplamlardır; verilmeyen makrolar puana girmez
+    calories = serializers.IntegerField(min_value=1)
+    protein = serializers.IntegerField(min_value=0, required=False)
+    carbs = serializers.IntegerField(min_value=0, required=False)
+    oil = serializers.IntegerField(min_value=0, required=False)
+    min_meals = serializers.IntegerField(min_value=1, max_value=20, default=1)
+    max_meals = serializers.IntegerField(min_value=1, max_value=20, default=6)
+    exclude = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    units = serializers.ListField(child=serializers.ChoiceField(choices=Meal._meta.get_field('unit').choices), required=False)
+    results = serializers.IntegerField(min_value=1, max_value=10, default=3)
+    save = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if attrs['min_meals'] > attrs['max_meals']:
+            raise serializers.ValidationError({'min_meals': ['Must not be greater than max_meals.']})
+        return attrs
+
+class MeasurementChartSerializer(serializers.Serializer):
+    field = serializers.ChoiceField(choices=timeseries.FIELDS, default='weight')
+    points = serializers.IntegerField(min_value=4, max_value=2000, default=200)
+    method = serializers.ChoiceField(choices=timeseries.METHODS, default='lttb')
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+class MembershipSerializer(TimedDataMixin, serializers.ModelSerializer):
+    active = serializers.ReadOnlyField()
+    remaining_days = serializers.ReadOnlyField()
+
+    class Meta:
+        model = User
+        fields = ['id', 'phone_number', 'first_name', 'last_name', 'membership_end', 'active', 'remaining_days']
+        read_only_fields = fields
+        list_serializer_class = TimedListSerializer
+
+class BulkMembershipSerializer(serializers.Serializer):
+    # Seçim: ids ya da filtreler (active, expires_within, program_id, diet_id) ya da all=true
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    active = serializers.BooleanField(required=False, allow_null=True, default=None)
+    expires_within = serializers.IntegerField(required=False, min_value=0)
+    program_id = serializers.IntegerField(required=False)
+    diet_id = serializers.IntegerField(required=False)
+    all = serializers.BooleanField(required=False, default=False)
+    # İşlemler
+    extend_days = serializers.IntegerField(required=False, min_value=1)
+    program = serializers.PrimaryKeyRelatedField(queryset=Program.objects.all(), required=False, allow_null=True)
+    diet = serializers.PrimaryKeyRelatedField(queryset=Diet.objects.all(), required=False, allow_null=True)
+
+    def validate(self, attrs):
+        selectors = ('ids', 'expires_within', 'program_id', 'diet_id')
+        if not attrs['all'] and attrs['active'] is None and not any(key in attrs for key in selectors):
+            raise serializers.ValidationError('Select users with ids, a filter or all=true.')
+        if not any(key in attrs for key in ('extend_days', 'program', 'diet')):
+            raise serializers.ValidationError('Nothing to update: send extend_days, program or diet.')
+        return attrs
+
+    def get_queryset(self):
+        data = self.validated_data
+        queryset = User.objects.all()
+        if 'ids' in data:
+            queryset = queryset.filter(pk__in=data['ids'])
+        if data['active'] is not None:
+            queryset = queryset.active(data['active'])
+        if 'expires_within' in data:
+            queryset = queryset.expiring_within(data['expires_within'])
+        if 'program_id' in data:
+            queryset = queryset.filter(program_id=data['program_id'])
+        if 'diet_id' in data:
+            queryset = queryset.filter(diet_id=data['diet_id'])
+        return queryset
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, TimedDataMixin, serializers.ModelSerializer):
     program = ProgramSerializer(read_only=True)
     diet = DietSerializer(read_only=True)
     age = serializers.ReadOnlyField()
@@ -39,6 +204,7 @@ class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False)
     height = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
     weight = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    expandable_fields = ['program', 'diet']
 
     class Meta:
         model = User
@@ -52,6 +218,7 @@ class UserSerializer(serializers.ModelSerializer):
             'birth_date', 'blood_type', 'membership_start', 'membership_end',
             'program', 'diet'
         ]
+        list_serializer_class = TimedListSerializer
 
     def create(self, validated_data):
         user = User(**validated_data)
@@ -71,5 +238,10 @@ class UserSerializer(serializers.ModelSerializer):
         if 'weight' in validated_data:
             instance.weight = validated_data.get('weight')
         
-        instance.save()
+        measured = {name: validated_data[name] for name in ('height', 'weight') if validated_data.get(name) is not None}
+        with transaction.atomic():
+            instance.save()
+            # Gönderilen ölçümler geçmişe eklenir
+            if measured:
+                Measurement.objects.create(user=instance, **measured)
         return instance
\ No newline at end of file
@@ -0,0 +1,165 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import token_cache
+from .models import Movement, Meal, Program, Diet, User
+from .sync import bury, touch
+from . import versioning
+
+_bulk = ContextVar('api_bulk_operation', default=False)
+
+
+@contextmanager
+def bulk_operation():
+    # Nesne başına çalışan sinyal işleyicilerini susturur; çağıran taraf toplu güncellemeyi kendisi yapar
+    token = _bulk.set(True)
+    try:
+        yield
+    finally:
+        _bulk.reset(token)
+
+
+@receiver(m2m_changed, sender=Diet.meals.through)
+def diet_meals_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # meal.diet_set.clear() sonrası hangi diyetlerin etkilendiğini bilemeyiz
+        instance._cleared_diet_ids = list(instance.diet_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        instance.refresh_totals()
+    elif action == 'post_clear':
+        Diet.objects.filter(pk__in=instance.__dict__.pop('_cleared_diet_ids', [])).refresh_totals()
+    elif pk_set:
+        Diet.objects.filter(pk__in=pk_set).refresh_totals()
+
+
+@receiver(post_save, sender=Meal)
+def meal_saved(sender, instance, created, raw=False, **kwargs):
+    if created or raw or _bulk.get():
+        return
+    # Yemeği paylaşan tüm diyetler tek bir UPDATE ile güncellenir
+    Diet.objects.filter(meals=instance).refresh_totals()
+
+
+@receiver(pre_delete, sender=Meal)
+def meal_deleting(sender, instance, **kwargs):
+    if _bulk.get():
+        return
+    instance._deleted_diet_ids = list(instance.diet_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Meal)
+def meal_deleted(sender, instance, **kwargs):
+    diet_ids = instance.__dict__.pop('_deleted_diet_ids', [])
+    if diet_ids:
+        Diet.objects.filter(pk__in=diet_ids).refresh_totals()
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    # Şifre, is_active vb. değişiklikler önbellekteki kullanıcıyı hemen geçersiz kılar
+    token_cache.invalidate(*Token.objects.filter(user=instance).values_list('key', flat=True))
+
+
+@receiver(post_save, sender=Movement)
+@receiver(post_delete, sender=Movement)
+@receiver(post_save, sender=Meal)
+@receiver(post_delete, sender=Meal)
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+@receiver(post_save, sender=Diet)
+@receiver(post_delete, sender=Diet)
+def catalog_changed(sender, raw=False, **kwargs):
+    if not raw and not _bulk.get():
+        versioning.bump(sender)
+
+
+@receiver(m2m_changed, sender=Program.movements.through)
+def program_movements_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        versioning.bump(Program)
+
+
+@receiver(m2m_changed, sender=Diet.meals.through)
+def diet_meals_versioned(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        versioning.bump(Diet)
+
+
+@receiver(post_delete, sender=Movement)
+@receiver(post_delete, sender=Meal)
+@receiver(post_delete, sender=Program)
+@receiver(post_delete, sender=Diet)
+@receiver(post_delete, sender=User)
+def object_deleted(sender, instance, **kwargs):
+    # Toplu silmelerde tombstone'ları BulkMixin yazar
+    if not _bulk.get():
+        bury(sender, [instance.pk])
+
+
+@receiver(m2m_changed, sender=Program.movements.through)
+def program_movements_touched(sender, instance, action, reverse, pk_set, **kwargs):
+    # Hareket listesi değişen programlar senkronizasyonda tekrar gönderilir
+    if action == 'pre_clear' and reverse:
+        instance._cleared_program_ids = list(instance.program_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        touch(Program.objects.filter(pk=instance.pk))
+    elif action == 'post_clear':
+        touch(Program.objects.filter(pk__in=instance.__dict__.pop('_cleared_program_ids', [])))
+    elif pk_set:
+        touch(Program.objects.filter(pk__in=pk_set))
+
+
+@receiver(pre_delete, sender=Movement)
+def movement_deleting(sender, instance, **kwargs):
+    # Ara tablo satırları m2m_changed göndermeden silinir
+    if not _bulk.get():
+        instance._deleted_program_ids = list(instance.program_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Movement)
+def movement_deleted(sender, instance, **kwargs):
+    program_ids = instance.__dict__.pop('_deleted_program_ids', [])
+    if program_ids:
+        touch(Program.objects.filter(pk__in=program_ids))
+
+
+@receiver(pre_delete, sender=Program)
+@receiver(pre_delete, sender=Diet)
+def assignment_deleting(sender, instance, **kwargs):
+    # SET_NULL üyeleri save() çağırmadan günceller
+    field = 'program' if sender is Program else 'diet'
+    instance._assigned_user_ids = list(User.objects.filter(**{field: instance}).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Program)
+@receiver(post_delete, sender=Diet)
+def assignment_deleted(sender, instance, **kwargs):
+    user_ids = instance.__dict__.pop('_assigned_user_ids', [])
+    if user_ids:
+        touch(User.objects.filter(pk__in=user_ids))
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
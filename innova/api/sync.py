@@ -0,0 +1,146 @@
+import base64
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.utils import timezone
+from .models import Movement, Meal, Program, Diet, User, Tombstone
+from .serializers import MovementSerializer, MealSerializer, ProgramSerializer, DietSerializer, UserSerializer
+
+# Delta senkronizasyonu: istemci son imlecini gönderir, o andan beri değişen satırlar (updated_at) ve
+# silinenler (Tombstone) tek yanıtta döner. M2M değişiklikleri sahibinin (Program/Diet) updated_at'ini
+# günceller; istemci ilişkinin tam id listesini yeniden alır.
+# İmleç, yanıtın hazırlanmaya başladığı zamandır. Uzun işlemlerin imleçten önce damgalanıp sonra commit
+# edilen satırları kaçmasın diye sorgular API_SYNC_OVERLAP saniye geriden başlar; istemci upsert yapmalıdır.
+# Her model sayfa başına en fazla API_SYNC_PAGE_SIZE satır (pk sırasıyla) döner. Kalan satır varsa yanıtta
+# `next` bulunur ve istemci ?page=<next> ile devam eder; `cursor` yalnızca son sayfada verilir ve ilk
+# sayfanın zamanını taşır, sayfalama sırasında değişen satırlar sonraki delta ile gelir.
+
+SYNC_MODELS = {
+    'movements': (Movement, MovementSerializer),
+    'meals': (Meal, MealSerializer),
+    'programs': (Program, ProgramSerializer),
+    'diets': (Diet, DietSerializer),
+    'users': (User, UserSerializer),
+}
+LABELS = {model._meta.label_lower: name for name, (model, _) in SYNC_MODELS.items()}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode(prefix, *parts):
+    return base64.urlsafe_b64encode(':'.join((prefix, *parts)).encode()).decode().rstrip('=')
+
+
+def _decode(prefix, token):
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+    parts = raw.split(':')
+    if parts[0] != prefix:
+        raise ValueError
+    return parts[1:]
+
+
+def _micros(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def _moment(micros):
+    return datetime.fromtimestamp(int(micros) / 1_000_000, tz=dt_timezone.utc)
+
+
+def encode_cursor(moment):
+    return _encode('v1', _micros(moment))
+
+
+def decode_cursor(cursor):
+    try:
+        micros, = _decode('v1', cursor)
+        return _moment(micros)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor from e
+
+
+def encode_page(now, since, after):
+    # after: model adı -> son gönderilen pk; tamamlanan modeller listede yer almaz
+    return _encode('p1', _micros(now), '' if since is None else _micros(since), *(
+        f'{name}={pk}' for name, pk in after.items()
+    ))
+
+
+def decode_page(token):
+    # (imleç zamanı, since, after) döndürür
+    try:
+        now, since, *after = _decode('p1', token)
+        after = {name: int(pk) for name, pk in (part.split('=') for part in after)}
+        if not after or not set(after) <= set(SYNC_MODELS):
+            raise ValueError
+        return _moment(now), _moment(since) if since else None, after
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor from e
+
+
+def touch(queryset):
+    # Sinyal göndermeyen toplu yazmalardan sonra satırları senkronizasyona düşürür
+    return queryset.update(updated_at=timezone.now())
+
+
+def bury(model, ids):
+    Tombstone.objects.bulk_create([Tombstone(label=model._meta.label_lower, object_id=pk) for pk in ids])
+
+
+def _queryset(name, model, user):
+    queryset = model._default_manager.all()
+    if model is User and not user.is_staff:
+        queryset = queryset.filter(pk=user.pk)
+    if model is Program:
+        queryset = queryset.prefetch_related('movements')
+    if model is Diet:
+        queryset = queryset.for_serializer()
+    return queryset
+
+
+def changes(user, since=None, page=None):
+    # since None ya da tombstone saklama süresinden eskiyse tüm veri (reset) döner.
+    # page, önceki yanıtın `next` değeridir (decode_page); verilirse since yok sayılır.
+    if page is not None:
+        now, since, after = page
+    else:
+        now, after = timezone.now(), dict.fromkeys(SYNC_MODELS, 0)
+    retention = timedelta(days=getattr(settings, 'API_SYNC_TOMBSTONE_DAYS', 90))
+    reset = since is None or since < now - retention
+    start = None if reset else since - timedelta(seconds=getattr(settings, 'API_SYNC_OVERLAP', 5))
+    page_size = getattr(settings, 'API_SYNC_PAGE_SIZE', 1000)
+
+    payload = {'reset': reset, 'changes': {}, 'deleted': {}}
+    remaining = {}
+    for name, (model, serializer_class) in SYNC_MODELS.items():
+        if name not in after:
+            continue
+        queryset = _queryset(name, model, user).filter(pk__gt=after[name])
+        if start is not None:
+            queryset = queryset.filter(updated_at__gt=start)
+        rows = list(queryset.order_by('pk')[:page_size + 1])
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            remaining[name] = rows[-1].pk
+        if rows:
+            payload['changes'][name] = serializer_class(rows, many=True, expand=[]).data
+
+    if start is not None and page is None:
+        tombstones = Tombstone.objects.filter(deleted_at__gt=start, label__in=list(LABELS)).order_by('pk')
+        for label, object_id in tombstones.values_list('label', 'object_id'):
+            name = LABELS[label]
+            if name == 'users' and not user.is_staff:
+                continue
+            payload['deleted'].setdefault(name, []).append(object_id)
+
+    if remaining:
+        payload['next'] = encode_page(now, since, remaining)
+    else:
+        payload['cursor'] = encode_cursor(now)
+    return payload
+
+
+def prune(days=None):
+    days = getattr(settings, 'API_SYNC_TOMBSTONE_DAYS', 90) if days is None else days
+    return Tombstone.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()[0]
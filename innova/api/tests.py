@@ -1,3 +1,1004 @@
-from django.test import TestCase
+import gzip
+import json
+import math
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from innova.middleware import compress
+from . import benchmark
+from .authentication import token_cache
+from .cache import profile_cache, response_cache
+from .management.commands.stress_db import run_writers
+from .throttling import limiter
+from .models import Movement, Meal, Program, Diet, User, Measurement
 
-# Create your tests here.
+class DietTotalsTests(TestCase):
+    def setUp(self):
+        self.meals = [
+            Meal.objects.create(name=f'Yemek {i}', amount=1, protein=i, carbs=2 * i, oil=3 * i, calories=100 * i)
+            for i in range(1, 4)
+        ]
+        self.staff = User.objects.create_user('+905550000000', 'pass', first_name='Admin', last_name='User', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_totals_follow_meal_changes(self):
+        diet = Diet.objects.create()
+        diet.meals.set(self.meals)
+        for d in (diet, Diet.objects.get(pk=diet.pk)):
+            self.assertEqual(d.total_calories, 600)
+            self.assertEqual(d.total_protein, 6)
+            self.assertEqual(d.total_carbs, 12)
+            self.assertEqual(d.total_oil, 18)
+            self.assertEqual(d.name, '600 Kcal Diyet')
+
+        self.meals[0].calories = 1000
+        self.meals[0].save()
+        self.assertEqual(Diet.objects.get(pk=diet.pk).total_calories, 1500)
+
+        self.meals[1].delete()
+        self.assertEqual(Diet.objects.get(pk=diet.pk).total_calories, 1300)
+
+        self.meals[2].diet_set.clear()
+        self.assertEqual(Diet.objects.get(pk=diet.pk).total_calories, 1000)
+
+        diet.meals.remove(self.meals[0])
+        self.assertEqual(diet.total_calories, 0)
+
+    def test_rebuild_diet_totals(self):
+        diet = Diet.objects.create()
+        diet.meals.set(self.meals)
+        Diet.objects.update(total_calories=0)
+        call_command('rebuild_diet_totals', batch_size=1, stdout=StringIO())
+        diet.refresh_from_db()
+        self.assertEqual(diet.total_calories, 600)
+
+    def test_diet_list_query_count_is_constant(self):
+        for _ in range(20):
+            Diet.objects.create().meals.set(self.meals)
+        # session/auth yok (force_authenticate): sürüm damgası + diyet sorgusu + meals prefetch
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/diets/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(response.data['results'][0]['total_calories'], 600)
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Meal.objects.bulk_create(Meal(name=f'Yemek {i:02d}', amount=1) for i in range(25))
+        self.staff = User.objects.create_user('+905550000000', 'pass', first_name='Admin', last_name='User', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_cursor_walks_whole_table(self):
+        names = []
+        url = '/api/meals/?page_size=10&ordering=-name'
+        while url:
+            response = self.client.get(url)
+            names += [meal['name'] for meal in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(names, sorted((f'Yemek {i:02d}' for i in range(25)), reverse=True))
+
+    def test_cursor_keeps_null_and_tied_rows(self):
+        ends = [None, date(2030, 1, 1), None, date(2030, 1, 1), date(2029, 6, 1), date(2030, 1, 1), None]
+        for i, end in enumerate(ends):
+            User.objects.create_user(f'+90555000010{i}', 'pass', first_name='Üye', last_name=str(i), membership_end=end)
+        for ordering in ('membership_end', '-membership_end'):
+            expected = [user.pk for user in User.objects.order_by(
+                F('membership_end').desc(nulls_last=True) if ordering.startswith('-') else F('membership_end').asc(nulls_last=True),
+                '-id' if ordering.startswith('-') else 'id',
+            )]
+            pages, url = [], f'/api/users/?page_size=3&ordering={ordering}&fields=id'
+            while url:
+                response = self.client.get(url)
+                pages.append([user['id'] for user in response.data['results']])
+                url = response.data['next']
+            self.assertEqual(sum(pages, []), expected, ordering)
+            # Son sayfadan geri dönüş aynı sayfaları verir
+            response = self.client.get(response.data['previous'])
+            self.assertEqual([user['id'] for user in response.data['results']], pages[-2], ordering)
+
+    def test_total_count_is_opt_in(self):
+        response = self.client.get('/api/meals/')
+        self.assertNotIn('X-Total-Count', response)
+        response = self.client.get('/api/meals/?with_count=1')
+        self.assertEqual(response['X-Total-Count'], '25')
+
+    @override_settings(API_COUNT_ESTIMATE_THRESHOLD=10)
+    def test_total_count_is_estimated_on_large_tables(self):
+        response = self.client.get('/api/meals/?with_count=1')
+        self.assertEqual(response['X-Total-Count-Estimated'], 'true')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user('+905551111111', 'pass', first_name='Ali', last_name='Veli')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_second_request_skips_token_lookup(self):
+        self.client.get('/api/users/')
+        # yalnızca kullanıcı listesi (program/diyet prefetch'leri boş olduğu için çalışmaz)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/users/').status_code, 200)
+        self.assertEqual(token_cache.stats()['hits'], 1)
+
+    def test_deactivation_and_logout_invalidate(self):
+        self.client.get('/api/users/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/users/').status_code, 403)
+
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.client.post('/api/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/users/').status_code, 403)
+
+    @override_settings(API_TOKEN_CACHE_BACKEND='default')
+    def test_shared_backend_invalidates_every_worker(self):
+        from .authentication import TokenCache
+        cache.clear()
+        first, second = TokenCache(), TokenCache()
+        first.set(self.token.key, self.user, self.token)
+        self.assertEqual(second.get(self.token.key)[0].pk, self.user.pk)
+        second.invalidate(self.token.key)
+        self.assertIsNone(first.get(self.token.key))
+        self.assertEqual(first.shared_hits, 0)
+        self.assertEqual(second.shared_hits, 1)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.meal = Meal.objects.create(name='Yulaf', amount=100, calories=380)
+        self.user = User.objects.create_user('+905552222222', 'pass', first_name='Ayşe', last_name='Yılmaz')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_matching_etag_returns_304_without_queryset(self):
+        response = self.client.get('/api/meals/')
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        # yalnızca sürüm damgası okunur
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/meals/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_changes_etag_of_dependent_endpoints(self):
+        diet = Diet.objects.create()
+        diet.meals.add(self.meal)
+        meals_etag = self.client.get('/api/meals/')['ETag']
+        diets_etag = self.client.get('/api/diets/')['ETag']
+        self.meal.calories = 400
+        self.meal.save()
+        self.assertEqual(self.client.get('/api/meals/', HTTP_IF_NONE_MATCH=meals_etag).status_code, 200)
+        self.assertEqual(self.client.get('/api/diets/', HTTP_IF_NONE_MATCH=diets_etag).status_code, 200)
+
+    def test_catalog_response_cache(self):
+        response_cache.clear()
+        first = self.client.get('/api/meals/')
+        second = self.client.get('/api/meals/')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(response_cache.stats()['hits'], 1)
+        self.assertEqual(response_cache.stats()['bytes_saved'], len(first.content))
+
+        self.meal.name = 'Yulaf ezmesi'
+        self.meal.save()
+        self.assertIn(b'Yulaf ezmesi', self.client.get('/api/meals/').content)
+
+    def test_cached_pages_keep_the_callers_host(self):
+        response_cache.clear()
+        Meal.objects.create(name='Elma', amount=1, calories=50)
+        for host in ('10.0.2.2', '192.168.1.90', '10.0.2.2'):
+            response = self.client.get('/api/meals/?page_size=1', HTTP_HOST=host)
+            self.assertTrue(json.loads(response.content)['next'].startswith(f'http://{host}/api/meals/'), host)
+        self.assertEqual(response_cache.stats()['hits'], 1)
+
+
+class BulkEndpointTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('+905550000000', 'pass', first_name='Admin', last_name='User', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_bulk_create_update_delete_meals(self):
+        payload = [{'name': f'Yemek {i}', 'amount': 1, 'calories': 10} for i in range(100)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/meals/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sum(q['sql'].startswith('INSERT INTO "api_meal"') for q in queries.captured_queries), 1)
+        self.assertEqual(Meal.objects.count(), 100)
+
+        ids = [meal['id'] for meal in response.data]
+        diet = Diet.objects.create()
+        diet.meals.set(ids[:3])
+        response = self.client.patch('/api/meals/bulk/', [{'id': pk, 'calories': 50} for pk in ids[:3]], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Diet.objects.get(pk=diet.pk).total_calories, 150)
+
+        response = self.client.delete('/api/meals/bulk/', {'ids': ids[:2]}, format='json')
+        self.assertEqual(response.data, {'deleted': 2})
+        self.assertEqual(Diet.objects.get(pk=diet.pk).total_calories, 50)
+
+    def test_bulk_errors_are_reported_per_item(self):
+        payload = [{'name': 'Şınav', 'video': 'https://youtu.be/x'}, {'name': 'Mekik', 'video': 'x', 'sets': 0}]
+        response = self.client.post('/api/movements/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1])
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'video', 'sets'})
+        self.assertFalse(Movement.objects.exists())
+
+    def test_bulk_ids_are_coerced_and_validated(self):
+        meal = Meal.objects.create(name='Elma', amount=1, calories=50)
+        response = self.client.patch('/api/meals/bulk/', [{'id': str(meal.pk), 'calories': 60}], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Meal.objects.get().calories, 60)
+
+        payload = [{'id': meal.pk, 'calories': 70}, {'id': [1]}, {'id': {}}, {'id': 'x'}, {'calories': 1}]
+        response = self.client.patch('/api/meals/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [(error['index'], error['errors']['id'][0]) for error in response.data['errors']],
+            [(1, 'A valid id is required.'), (2, 'A valid id is required.'), (3, 'A valid id is required.'),
+             (4, 'Object with this id does not exist.')],
+        )
+        self.assertEqual(Meal.objects.get().calories, 60)
+        self.assertEqual(self.client.delete('/api/meals/bulk/', {'ids': [[1]]}, format='json').status_code, 400)
+
+    def test_program_movement_membership(self):
+        program = Program.objects.create(name='Başlangıç')
+        movements = Movement.objects.bulk_create(Movement(name=f'H{i}', video='https://youtu.be/x') for i in range(5))
+        response = self.client.post(f'/api/programs/{program.pk}/movements/', {'add': [m.pk for m in movements]}, format='json')
+        self.assertEqual(len(response.data['movements']), 5)
+        response = self.client.post(f'/api/programs/{program.pk}/movements/', {'remove': [movements[0].pk], 'add': [999]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(program.movements.count(), 5)
+
+
+class MembershipStatusTests(TestCase):
+    def setUp(self):
+        today = date.today()
+        self.staff = User.objects.create_user('+905550000000', 'pass', first_name='Admin', last_name='User', is_staff=True)
+        for i, days in enumerate([-3, 0, 2, 5, 30]):
+            User.objects.create_user(
+                f'+90555300000{i}', 'pass', first_name='Üye', last_name=str(i),
+                membership_end=today + timedelta(days=days),
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_annotations_match_properties(self):
+        for user in User.objects.with_membership_status():
+            plain = User.objects.get(pk=user.pk)
+            self.assertEqual(user.active, plain.active)
+            self.assertEqual(user.remaining_days, plain.remaining_days)
+
+    def test_filters_and_ordering(self):
+        response = self.client.get('/api/users/?active=true&ordering=-remaining_days')
+        self.assertEqual([u['remaining_days'] for u in response.data['results']], [30, 5, 2, 0])
+        response = self.client.get('/api/users/?expires_within=5&ordering=remaining_days')
+        self.assertEqual([u['remaining_days'] for u in response.data['results']], [0, 2, 5])
+
+    def test_expiring_endpoint(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/expiring/?days=3')
+        self.assertEqual([u['remaining_days'] for u in response.data['results']], [0, 2])
+        response = self.client.get('/api/users/expiring/?days=-1')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'days': ['Must be zero or greater.']})
+
+    def test_bulk_membership_renewal(self):
+        program = Program.objects.create(name='Kış kampı')
+        response = self.client.post(
+            '/api/users/bulk-membership/',
+            {'expires_within': 5, 'extend_days': 30, 'program': program.pk},
+            format='json',
+        )
+        self.assertEqual(response.data, {'updated': 3})
+        self.assertEqual(
+            sorted(User.objects.filter(program=program).values_list('membership_end', flat=True)),
+            [date.today() + timedelta(days=d) for d in (30, 32, 35)],
+        )
+        self.assertEqual(self.client.post('/api/users/bulk-membership/', {'extend_days': 30}, format='json').status_code, 400)
+
+
+class ConcurrentWriteTests(TransactionTestCase):
+    def test_parallel_writers_do_not_hit_lock_errors(self):
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                self.assertEqual(cursor.fetchone()[0], 'wal')
+        errors, _ = run_writers(writers=8, iterations=10)
+        self.assertEqual(errors, [])
+
+
+class AsyncReadTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        Meal.objects.bulk_create(Meal(name=f'Yemek {i}', amount=1) for i in range(5))
+        self.user = User.objects.create_user('+905554444444', 'pass', first_name='Can', last_name='Kaya')
+        self.token = Token.objects.create(user=self.user)
+        self.headers = {'Authorization': f'Token {self.token.key}'}
+
+    async def test_async_list_pagination_and_detail(self):
+        client = AsyncClient()
+        response = await client.get('/api/async/meals/?page_size=3', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['results']), 3)
+        response = await client.get(data['next'], headers=self.headers)
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertIsNone(response.json()['next'])
+
+        pk = data['results'][0]['id']
+        response = await client.get(f'/api/async/meals/{pk}/', headers=self.headers)
+        self.assertEqual(response.json()['id'], pk)
+
+    async def test_async_users_are_scoped_and_authenticated(self):
+        client = AsyncClient()
+        self.assertEqual((await client.get('/api/async/users/')).status_code, 401)
+        response = await client.get('/api/async/users/', headers=self.headers)
+        self.assertEqual([u['id'] for u in response.json()['results']], [self.user.pk])
+
+
+class QueryBudgetTests(TestCase):
+    def test_endpoints_stay_within_query_budgets(self):
+        benchmark.generate(scale=0.002, seed=1)
+        results = benchmark.run(iterations=3, only=set(benchmark.QUERY_BUDGETS) - {'token'})
+        for name, result in results.items():
+            self.assertEqual(result['status'], [200], name)
+            self.assertFalse(result['over_budget'], f"{name}: {result['max_queries']} > {result['query_budget']}")
+
+    def test_benchmark_is_not_throttled(self):
+        benchmark.generate(scale=0.002, seed=1)
+        with override_settings(API_THROTTLE_RATES={'catalog_read': '1/min'}):
+            result = benchmark.run(iterations=3, only={'meals-list'})['meals-list']
+        self.assertEqual(result['status'], [200])
+        self.assertFalse(result['failed'])
+
+
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('+905556666666', 'pass', first_name='Ece', last_name='Demir')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/users/')
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        for name in ('auth', 'serialize', 'total'):
+            self.assertIn(f'{name};dur=', timing)
+
+    @override_settings(REQUEST_TIMING={'SLOW_REQUEST_MS': 0})
+    def test_slow_requests_are_logged(self):
+        with self.assertLogs('innova.requests', 'WARNING') as logs:
+            self.client.get('/api/users/')
+        record = json.loads(logs.output[0].split(':', 2)[2])
+        self.assertEqual(record['path'], '/api/users/')
+        self.assertGreater(record['queries'], 0)
+        self.assertTrue(record['slowest_sql'])
+
+
+class AdminScaleTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_superuser('+905550000000', 'pass', first_name='Admin', last_name='User')
+        self.client.force_login(self.staff)
+        benchmark.generate(scale=0.001, seed=3)
+
+    def test_changelists_do_not_query_per_row(self):
+        user = User.objects.exclude(diet=None).first()
+        for url in ('/admin/api/user/', '/admin/api/diet/', '/admin/api/program/', f'/admin/api/user/{user.pk}/change/'):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertLess(len(queries.captured_queries), 15, url)
+
+    def test_user_prefix_search(self):
+        user = User.objects.filter(first_name__startswith='Üye').first()
+        response = self.client.get('/admin/api/user/', {'q': str(user.phone_number)[:8]})
+        self.assertContains(response, user.first_name)
+        self.assertEqual(list(User.objects.search('bench')), list(User.objects.filter(first_name='Bench')))
+
+    def test_user_search_matches_every_word(self):
+        ali = User.objects.create_user('+905551110001', 'pass', first_name='Ali', last_name='Yılmaz')
+        User.objects.create_user('+905551110002', 'pass', first_name='Ali', last_name='Demir')
+        User.objects.create_user('+905551110003', 'pass', first_name='Yılmaz', last_name='Kaya')
+        self.assertEqual(list(User.objects.search('ali yıl')), [ali])
+        self.assertEqual(list(User.objects.search('  yıl  AL ')), [ali])
+        self.assertEqual(User.objects.search('ali').count(), 2)
+        self.assertEqual(list(User.objects.search('+90 555 111 0001')), [ali])
+
+    def test_membership_actions_require_a_choice(self):
+        users = list(User.objects.exclude(program=None).values_list('pk', flat=True)[:3])
+        program = Program.objects.create(name='Yeni program')
+
+        def act(action, **data):
+            return self.client.post('/admin/api/user/', {'action': action, '_selected_action': users, **data}, follow=True)
+
+        self.assertContains(act('assign_program', program=''), 'Program id girin.')
+        self.assertEqual(User.objects.filter(pk__in=users, program=None).count(), 0)
+        self.assertContains(act('assign_program', program=999999), 'bulunamadı')
+        act('assign_program', program=program.pk)
+        self.assertEqual(set(User.objects.filter(pk__in=users).values_list('program', flat=True)), {program.pk})
+        act('clear_program')
+        self.assertEqual(User.objects.filter(pk__in=users, program=None).count(), 3)
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        meal = Meal.objects.create(name='Yumurta', amount=2, calories=150)
+        diet = Diet.objects.create()
+        diet.meals.add(meal)
+        program = Program.objects.create(name='Güç')
+        program.movements.add(Movement.objects.create(name='Squat', video='https://youtu.be/x'))
+        self.user = User.objects.create_user(
+            '+905557777777', 'pass', first_name='Deniz', last_name='Ak',
+            membership_end=date.today() + timedelta(days=10), program=program, diet=diet,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_membership_poll_reads_one_narrow_row(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/?fields=active,remaining_days')
+        self.assertEqual(response.data['results'], [{'active': True, 'remaining_days': 10}])
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertNotIn('first_name', queries.captured_queries[0]['sql'])
+
+    def test_expand_only_requested_relations(self):
+        response = self.client.get('/api/users/?fields=id,program,diet&expand=diet')
+        user = response.data['results'][0]
+        self.assertEqual(user['program'], self.user.program_id)
+        self.assertEqual(user['diet']['total_calories'], 150)
+        self.assertEqual(user['diet']['meals'][0]['name'], 'Yumurta')
+
+        response = self.client.get('/api/diets/?expand=')
+        self.assertEqual(response.data['results'][0]['meals'], [self.user.diet.meals.get().pk])
+        response = self.client.get('/api/programs/?fields=name')
+        self.assertEqual(response.data['results'], [{'name': 'Güç'}])
+
+class FastReadPathTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Meal.objects.create(name='Süt \u2028 "tam"', amount=200, unit='ml', protein=6, carbs=9, oil=6, calories=120)
+        Meal.objects.create(name='Yulaf', amount=50, calories=190)
+        Movement.objects.create(name='Şınav', video='https://youtu.be/y', sets=4, reps=12)
+        program = Program.objects.create(name='Güç')
+        self.staff = User.objects.create_user(
+            '+905558888888', 'pass', first_name='Ece', last_name='Öz', is_staff=True,
+            height='172.5', weight='61.05', birth_date=date(1994, 2, 28), blood_type='A+',
+            membership_end=date.today() + timedelta(days=3), program=program,
+        )
+        User.objects.create_user('+905558888889', 'pass', first_name='Can', last_name='Er')
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def assertSameAsSerializer(self, url):
+        fast = self.client.get(url)
+        cache.clear()
+        with override_settings(API_FAST_READ_PATH=False):
+            slow = self.client.get(url)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_output_is_byte_identical(self):
+        self.assertIn(b'\\u2028', self.assertSameAsSerializer('/api/meals/').content)
+        self.assertSameAsSerializer('/api/movements/?fields=name,reps&ordering=-name')
+        response = self.assertSameAsSerializer('/api/users/?expand=')
+        self.assertEqual(response.data['results'][0]['height'], '172.50')
+        self.assertEqual(response.data['results'][0]['birth_date'], '1994-02-28')
+        self.assertSameAsSerializer('/api/users/?fields=id,age,active,remaining_days,weight,membership_end&expand=')
+
+    def test_nested_output_uses_serializer(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/users/')
+        self.assertEqual(response.data['results'][0]['program']['name'], 'Güç')
+        self.assertTrue(any('api_program' in query['sql'] for query in queries.captured_queries))
+
+    def test_renderer_falls_back_for_unsupported_types(self):
+        from decimal import Decimal
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer
+        for data in ({'a': 'ü ', 'b': [1, None, True]}, {'price': Decimal('1.50')}, {1: 'x'}):
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+class NestedMemoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.program = Program.objects.create(name='Kuvvet')
+        self.program.movements.add(Movement.objects.create(name='Deadlift', video='https://youtu.be/z'))
+        diet = Diet.objects.create()
+        diet.meals.add(Meal.objects.create(name='Pilav', amount=1, calories=300))
+        self.staff = User.objects.create_user('+905556666600', 'pass', first_name='A', last_name='B', is_staff=True)
+        for i in range(1, 6):
+            User.objects.create_user(f'+90555666660{i}', 'pass', first_name='Üye', last_name=str(i), program=self.program, diet=diet)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_shared_plans_are_serialized_once_per_response(self):
+        results = self.client.get('/api/users/?active=false').data['results']
+        members = [user for user in results if user['program']]
+        self.assertEqual(len(members), 5)
+        self.assertTrue(all(user['program'] is members[0]['program'] for user in members))
+        self.assertTrue(all(user['diet'] is members[0]['diet'] for user in members))
+        self.assertEqual(members[0]['program']['movements'][0]['name'], 'Deadlift')
+
+    def test_cross_request_cache_follows_data_version(self):
+        from unittest import mock
+        from .cache import LRUCache
+        shared = LRUCache(maxsize=100)
+        with mock.patch('api.serializers.nested_cache', shared):
+            self.client.get('/api/users/')
+            self.client.get('/api/users/')
+            self.assertEqual(shared.stats()['hits'], 2)
+            self.program.name = 'Hipertrofi'
+            self.program.save()
+            results = self.client.get('/api/users/').data['results']
+        self.assertEqual({user['program']['name'] for user in results if user['program']}, {'Hipertrofi'})
+
+    async def test_cross_request_cache_on_async_views(self):
+        from unittest import mock
+        from .cache import LRUCache
+        token_cache.clear()
+        token = await Token.objects.acreate(user=self.staff)
+        headers = {'Authorization': f'Token {token.key}'}
+        client = AsyncClient()
+        shared = LRUCache(maxsize=100)
+        with mock.patch('api.serializers.nested_cache', shared):
+            response = await client.get('/api/async/users/', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            await client.get('/api/async/users/', headers=headers)
+        self.assertEqual(shared.stats()['hits'], 2)
+        members = [user for user in response.json()['results'] if user['program']]
+        self.assertEqual(members[0]['program']['movements'][0]['name'], 'Deadlift')
+
+class TransferTests(TestCase):
+    def setUp(self):
+        self.movements = [Movement.objects.create(name=f'Hareket {i}', video='https://youtu.be/x') for i in range(3)]
+        program = Program.objects.create(name='Başlangıç')
+        program.movements.set(self.movements[:2])
+        self.staff = User.objects.create_user('+905554444400', 'pass', first_name='Yönetici', last_name='X', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_export_streams_csv_and_jsonl(self):
+        response = self.client.get('/api/export/programs.csv')
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.splitlines(), ['id,name,movements', f'{Program.objects.get().pk},Başlangıç,{self.movements[0].pk};{self.movements[1].pk}'])
+
+        lines = b''.join(self.client.get('/api/export/users.jsonl').streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(lines[0])['phone_number'], '+905554444400')
+        self.assertNotIn('password', lines[0])
+        self.assertEqual(self.client.get('/api/export/tokens.csv').status_code, 404)
+
+    def test_import_writes_valid_rows_and_reports_errors_by_line(self):
+        meal = Meal.objects.create(name='Elma', amount=1, calories=50)
+        body = (
+            'id,meals\n'
+            f'100,{meal.pk}\n'
+            '101,999\n'
+            f'102,{meal.pk};x\n'
+        )
+        response = self.client.post('/api/import/diets.csv', body, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 4])
+        self.assertEqual(response.data['errors'][0]['errors'], {'meals': ['Invalid pk "999" - object does not exist.']})
+        self.assertEqual(Diet.objects.get(pk=100).total_calories, 50)
+
+        rows = [
+            {'phone_number': '+905554444401', 'first_name': 'Ada', 'last_name': 'Y', 'height': '170.5', 'diet': 100, 'membership_end': '2030-01-01'},
+            {'phone_number': '+905554444400', 'first_name': 'Eş', 'last_name': 'Z', 'membership_end': '2030-01-01'},
+            {'phone_number': '+905554444402', 'first_name': '', 'last_name': 'Z', 'birth_date': 'dün', 'membership_end': '2030-01-01'},
+        ]
+        response = self.client.post(
+            '/api/import/users.jsonl', '\n'.join(json.dumps(row) for row in rows), content_type='application/x-ndjson',
+        )
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'phone_number'})
+        self.assertEqual(set(response.data['errors'][1]['errors']), {'first_name', 'birth_date'})
+        user = User.objects.get(phone_number='+905554444401')
+        self.assertEqual((user.diet_id, str(user.height), user.has_usable_password()), (100, '170.50', False))
+
+    def test_commands_round_trip(self):
+        out = StringIO()
+        call_command('export_data', 'programs', '--format', 'jsonl', stdout=out)
+        Program.objects.all().delete()
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', encoding='utf-8', delete=False) as stream:
+            stream.write(out.getvalue())
+        call_command('import_data', 'programs', stream.name, stdout=StringIO(), stderr=StringIO())
+        program = Program.objects.get()
+        self.assertEqual(list(program.movements.order_by('pk')), self.movements[:2])
+
+class TokenLoginTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user('+905553333300', 'gizli-parola', first_name='Elif', last_name='K')
+
+    def test_login_reuses_token_and_primes_cache(self):
+        client = APIClient()
+        first = client.post('/api/token/', {'username': '+905553333300', 'password': 'gizli-parola'}, format='json')
+        second = client.post('/api/token/', {'username': '+905553333300', 'password': 'gizli-parola'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['token'], second.json()['token'])
+        self.assertEqual(Token.objects.filter(user=self.user).count(), 1)
+
+        client.credentials(HTTP_AUTHORIZATION=f"Token {first.json()['token']}")
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/api/users/?fields=id')
+        self.assertFalse(any('authtoken_token' in query['sql'] for query in queries.captured_queries))
+
+    def test_rejects_bad_credentials_and_sheds_load(self):
+        from .authentication import hash_pool
+        client = APIClient()
+        response = client.post('/api/token/', {'username': '+905553333300', 'password': 'yanlış'})
+        self.assertEqual(response.json(), {'non_field_errors': ['Unable to log in with provided credentials.']})
+        response = client.post('/api/token/', {'username': '+905559999999', 'password': 'yanlış'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(client.post('/api/token/', {}).json(), {
+            'username': ['This field is required.'], 'password': ['This field is required.'],
+        })
+
+        hash_pool.pending = hash_pool.workers + hash_pool.queue_limit
+        try:
+            response = client.post('/api/token/', {'username': '+905553333300', 'password': 'gizli-parola'})
+        finally:
+            hash_pool.pending = 0
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+class PasswordUpgradeTests(TransactionTestCase):
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ])
+    def test_outdated_hash_is_upgraded_after_login(self):
+        from django.contrib.auth.hashers import make_password
+        from .authentication import hash_pool
+        user = User.objects.create_user('+905553333301', first_name='Eski', last_name='Hash')
+        User.objects.filter(pk=user.pk).update(password=make_password('parola', hasher='md5'))
+        response = APIClient().post('/api/token/', {'username': '+905553333301', 'password': 'parola'})
+        self.assertEqual(response.status_code, 200)
+        # Yükseltme arka planda yapılır; tek thread'li kuyruğun boşalması beklenir
+        hash_pool.rehash_executor.submit(lambda: None).result()
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(user.check_password('parola'))
+
+class DietPlannerTests(TestCase):
+    def setUp(self):
+        self.meals = {
+            name: Meal.objects.create(name=name, amount=1, unit=unit, calories=calories, protein=protein)
+            for name, unit, calories, protein in [
+                ('Yulaf', 'gram', 400, 15), ('Tavuk', 'gram', 600, 60), ('Pilav', 'gram', 500, 8),
+                ('Ayran', 'liter', 100, 6), ('Baklava', 'piece', 900, 5),
+            ]
+        }
+        self.staff = User.objects.create_user('+905552222200', 'pass', first_name='Diyetisyen', last_name='D', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_finds_sets_matching_targets_within_constraints(self):
+        response = self.client.post('/api/diets/plan/', {'calories': 1500, 'protein': 83, 'max_meals': 3}, format='json')
+        self.assertEqual(response.status_code, 200)
+        best = response.data['candidates'][0]
+        self.assertEqual(best['score'], 0)
+        self.assertEqual(sorted(meal['name'] for meal in best['meals']), ['Pilav', 'Tavuk', 'Yulaf'])
+        self.assertEqual(best['totals'], {'calories': 1500, 'protein': 83, 'carbs': 0, 'oil': 0})
+        self.assertIsNone(response.data['diet'])
+
+        response = self.client.post('/api/diets/plan/', {
+            'calories': 1500, 'max_meals': 2, 'units': ['gram'], 'exclude': [self.meals['Tavuk'].pk],
+        }, format='json')
+        for candidate in response.data['candidates']:
+            self.assertLessEqual(len(candidate['meal_ids']), 2)
+            self.assertNotIn(self.meals['Tavuk'].pk, candidate['meal_ids'])
+            self.assertTrue(all(meal['unit'] == 'gram' for meal in candidate['meals']))
+
+    def test_save_creates_diet_and_requires_staff(self):
+        response = self.client.post('/api/diets/plan/', {'calories': 1000, 'save': True}, format='json')
+        self.assertEqual(response.data['diet']['total_calories'], 1000)
+        self.assertEqual(Diet.objects.get().total_calories, 1000)
+        self.assertEqual(
+            self.client.post('/api/diets/plan/', {'calories': 1000, 'min_meals': 4, 'max_meals': 2}, format='json').status_code, 400,
+        )
+
+        member = User.objects.create_user('+905552222201', 'pass', first_name='Üye', last_name='U')
+        self.client.force_authenticate(member)
+        self.assertEqual(self.client.post('/api/diets/plan/', {'calories': 1000}, format='json').status_code, 403)
+
+    def test_finds_close_plans_in_10k_meals(self):
+        # Süre bütçesi yalnızca manage.py benchmark --planner-meals ile ölçülür; burada çözüm kalitesi sınanır
+        import random
+        from .planner import Catalog, plan
+        rng = random.Random(7)
+        rows = {}
+        for pk in range(1, 10_001):
+            protein, carbs, oil = rng.randint(0, 50), rng.randint(0, 100), rng.randint(0, 40)
+            rows[pk] = (pk, 'gram', 4 * protein + 4 * carbs + 9 * oil, protein, carbs, oil)
+        catalog = Catalog.from_rows(list(rows.values()))
+        for target in (
+            {'calories': 2000, 'protein': 150, 'carbs': 200, 'oil': 60},
+            {'calories': 1500, 'protein': 120},
+        ):
+            candidates = plan(catalog, target, max_meals=8)
+            self.assertTrue(candidates)
+            self.assertEqual([c['score'] for c in candidates], sorted(c['score'] for c in candidates))
+            self.assertLess(candidates[0]['score'], 0.05)
+            for candidate in candidates:
+                self.assertLessEqual(len(candidate['meal_ids']), 8)
+                self.assertEqual(len(set(candidate['meal_ids'])), len(candidate['meal_ids']))
+                totals = [sum(rows[pk][2 + k] for pk in candidate['meal_ids']) for k in range(4)]
+                self.assertEqual(list(candidate['totals'].values()), totals)
+                deviation = sum(abs(candidate['totals'][name] - value) / value for name, value in target.items())
+                self.assertAlmostEqual(candidate['score'], deviation, places=3)
+
+
+@override_settings(API_SYNC_OVERLAP=0)
+class SyncTests(TestCase):
+    def setUp(self):
+        self.movements = [Movement.objects.create(name=f'Hareket {i}', video=f'https://youtu.be/{i}') for i in range(3)]
+        self.meal = Meal.objects.create(name='Yulaf', amount=1, calories=400)
+        self.program = Program.objects.create(name='Başlangıç')
+        self.program.movements.set(self.movements[:2])
+        self.diet = Diet.objects.create()
+        self.diet.meals.set([self.meal])
+        self.staff = User.objects.create_user('+905553333300', 'pass', first_name='Admin', last_name='A', is_staff=True)
+        self.member = User.objects.create_user(
+            '+905553333301', 'pass', first_name='Üye', last_name='U',
+            membership_end=date.today() + timedelta(days=30), program=self.program, diet=self.diet,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def cursor(self):
+        # Kurulumda yazılan satırlar imleçten önceye çekilir
+        past = timezone.now() - timedelta(hours=1)
+        for model in (Movement, Meal, Program, Diet, User):
+            model.objects.update(updated_at=past)
+        return self.client.get('/api/sync/').data['cursor']
+
+    def test_full_sync_then_empty_delta(self):
+        response = self.client.get('/api/sync/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['reset'])
+        self.assertEqual(len(response.data['changes']['movements']), 3)
+        self.assertEqual(response.data['changes']['programs'][0]['movements'], [m.pk for m in self.movements[:2]])
+        self.assertEqual(response.data['changes']['users'][1]['program'], self.program.pk)
+
+        response = self.client.get('/api/sync/', {'since': self.cursor()})
+        self.assertEqual(response.data, {'cursor': response.data['cursor'], 'reset': False})
+        self.assertEqual(self.client.get('/api/sync/', {'since': 'bozuk'}).status_code, 400)
+
+    def test_delta_contains_changes_deletes_and_relations(self):
+        cursor = self.cursor()
+        self.client.patch(f'/api/meals/{self.meal.pk}/', {'calories': 500}, format='json')
+        self.client.post(f'/api/programs/{self.program.pk}/movements/', {'add': [self.movements[2].pk]}, format='json')
+        self.client.delete(f'/api/movements/{self.movements[0].pk}/')
+
+        data = self.client.get('/api/sync/', {'since': cursor}).data
+        self.assertEqual([row['calories'] for row in data['changes']['meals']], [500])
+        # Yemek değişince diyet toplamı da değişir
+        self.assertEqual(data['changes']['diets'][0]['total_calories'], 500)
+        self.assertEqual(data['changes']['programs'][0]['movements'], [m.pk for m in self.movements[1:]])
+        self.assertEqual(data['deleted'], {'movements': [self.movements[0].pk]})
+        self.assertNotIn('movements', data['changes'])
+
+        cursor = self.cursor()
+        self.client.delete(f'/api/programs/{self.program.pk}/')
+        self.client.delete('/api/movements/bulk/', {'ids': [self.movements[1].pk]}, format='json')
+        data = self.client.get('/api/sync/', {'since': cursor}).data
+        self.assertEqual(data['deleted'], {'movements': [self.movements[1].pk], 'programs': [self.program.pk]})
+        self.assertEqual(data['changes']['users'][0]['program'], None)
+
+    @override_settings(API_SYNC_PAGE_SIZE=2)
+    def test_large_snapshots_are_paged(self):
+        Movement.objects.create(name='Hareket 3', video='https://youtu.be/3')
+        seen, pages, params = {}, 0, {}
+        while True:
+            data = self.client.get('/api/sync/', params).data
+            pages += 1
+            self.assertTrue(data['reset'])
+            for name, rows in data.get('changes', {}).items():
+                self.assertLessEqual(len(rows), 2)
+                seen.setdefault(name, []).extend(row['id'] for row in rows)
+            if 'next' not in data:
+                break
+            self.assertNotIn('cursor', data)
+            params = {'page': data['next']}
+        self.assertEqual(pages, 2)
+        self.assertEqual(seen['movements'], list(Movement.objects.order_by('pk').values_list('pk', flat=True)))
+        self.assertEqual(seen['users'], [self.staff.pk, self.member.pk])
+        self.assertIn('cursor', data)
+        self.assertEqual(self.client.get('/api/sync/', {'page': 'bozuk'}).status_code, 400)
+
+    def test_member_sees_only_own_profile(self):
+        cursor = self.cursor()
+        User.objects.create_user('+905553333302', 'pass', first_name='Diğer', last_name='D').delete()
+        self.client.force_authenticate(self.member)
+        data = self.client.get('/api/sync/', {'since': cursor}).data
+        self.assertNotIn('deleted', data)
+        self.assertEqual([row['id'] for row in self.client.get('/api/sync/').data['changes']['users']], [self.member.pk])
+
+
+class ProfileBootstrapTests(TestCase):
+    def setUp(self):
+        profile_cache.clear()
+        self.movement = Movement.objects.create(name='Squat', video='https://youtu.be/squat')
+        self.meal = Meal.objects.create(name='Yulaf', amount=1, calories=400, protein=15)
+        self.program = Program.objects.create(name='Güç')
+        self.program.movements.set([self.movement])
+        self.diet = Diet.objects.create()
+        self.diet.meals.set([self.meal])
+        self.member = User.objects.create_user(
+            '+905554444400', 'pass', first_name='Üye', last_name='U',
+            membership_end=date.today() + timedelta(days=10), program=self.program, diet=self.diet,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def test_document_is_cached_and_follows_changes(self):
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/users/me/')
+        self.assertEqual(response.data['remaining_days'], 10)
+        self.assertEqual(response.data['program']['movements'][0]['name'], 'Squat')
+        self.assertEqual(response.data['diet']['total_calories'], 400)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/users/me/').data, response.data)
+        self.assertEqual(self.client.get('/api/users/me/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        Movement.objects.filter(pk=self.movement.pk).update(name='Front Squat', updated_at=timezone.now())
+        self.assertEqual(self.client.get('/api/users/me/').data['program']['movements'][0]['name'], 'Front Squat')
+        self.meal.calories = 500
+        self.meal.save()
+        self.assertEqual(self.client.get('/api/users/me/').data['diet']['total_calories'], 500)
+        self.diet.meals.clear()
+        self.assertEqual(self.client.get('/api/users/me/').data['diet']['meals'], [])
+        self.program.delete()
+        self.assertIsNone(self.client.get('/api/users/me/').data['program'])
+        self.client.patch(f'/api/users/{self.member.pk}/', {'weight': '70.00'}, format='json')
+        self.assertEqual(self.client.get('/api/users/me/').data['weight'], '70.00')
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Meal.objects.bulk_create([Meal(name=f'Yemek {i}', amount=100, calories=100 + i) for i in range(40)])
+        self.staff = User.objects.create_user('+905555555500', 'pass', first_name='Admin', last_name='A', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_cached_list_is_compressed_once_and_keeps_etag(self):
+        plain = self.client.get('/api/meals/')
+        self.assertNotIn('Content-Encoding', plain)
+        with mock.patch('api.views.compress', wraps=compress) as compressor:
+            first = self.client.get('/api/meals/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+            second = self.client.get('/api/meals/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressor.call_count, 1)
+        for response in (first, second):
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertEqual(gzip.decompress(response.content), plain.content)
+            self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        self.assertLess(len(first.content), len(plain.content) / 3)
+        self.assertEqual(self.client.get('/api/meals/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        small = self.client.get('/api/meals/?fields=id&page_size=1', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', small)
+
+    def test_streaming_export_is_compressed_incrementally(self):
+        response = self.client.get('/api/export/meals.csv?chunk_size=10', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 4)
+        self.assertEqual(gzip.decompress(b''.join(chunks)).decode().count('\n'), 41)
+
+
+@override_settings(API_THROTTLE_RATES={'login': '2/min', 'profile_write': '2/min', 'catalog_read': '3/min', 'staff_bulk': '1/min'})
+class ThrottleTests(TestCase):
+    def setUp(self):
+        limiter.clear()
+        self.addCleanup(limiter.clear)
+        self.staff = User.objects.create_user('+905556666600', 'pass', first_name='Admin', last_name='A', is_staff=True)
+        self.member = User.objects.create_user('+905556666601', 'pass', first_name='Üye', last_name='U')
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def test_scopes_are_limited_separately(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/meals/').status_code, 200)
+        response = self.client.get('/api/movements/')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+        # Profil okumaları yazma kapsamına girmez
+        for status_code in (200, 200, 429):
+            self.assertEqual(self.client.patch(f'/api/users/{self.member.pk}/', {'weight': '70'}, format='json').status_code, status_code)
+        self.assertEqual(self.client.get('/api/users/me/').status_code, 200)
+
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.get('/api/meals/').status_code, 200)
+        self.assertEqual(self.client.delete('/api/meals/bulk/', {'ids': []}, format='json').status_code, 200)
+        self.assertEqual(self.client.post('/api/meals/', [], format='json').status_code, 429)
+
+        self.assertEqual(limiter.stats()['scopes'], {
+            'catalog_read': {'allowed': 4, 'rejected': 1},
+            'profile_write': {'allowed': 2, 'rejected': 1},
+            'staff_bulk': {'allowed': 1, 'rejected': 1},
+        })
+
+    def test_login_is_limited_by_client_address(self):
+        client = APIClient()
+        for _ in range(2):
+            self.assertEqual(client.post('/api/token/', {'username': '+905556666601', 'password': 'yanlış'}).status_code, 400)
+        response = client.post('/api/token/', {'username': '+905556666601', 'password': 'pass'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        # Proxy tanımlı değilken X-Forwarded-For ile yeni kova açılamaz
+        self.assertEqual(APIClient(HTTP_X_FORWARDED_FOR='203.0.113.7').post(
+            '/api/token/', {'username': '+905556666601', 'password': 'pass'},
+        ).status_code, 429)
+        self.assertEqual(APIClient(REMOTE_ADDR='10.0.2.15').post(
+            '/api/token/', {'username': '+905556666601', 'password': 'pass'},
+        ).status_code, 200)
+
+
+class MeasurementTests(TestCase):
+    def setUp(self):
+        self.member = User.objects.create_user('+905557777700', 'pass', first_name='Üye', last_name='U')
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def test_profile_patch_appends_history(self):
+        self.client.patch(f'/api/users/{self.member.pk}/', {'weight': '82.50'}, format='json')
+        self.client.patch(f'/api/users/{self.member.pk}/', {'weight': '81.00', 'height': '180'}, format='json')
+        self.client.patch(f'/api/users/{self.member.pk}/', {'password': 'yeni-parola'}, format='json')
+        self.assertEqual(
+            list(Measurement.objects.order_by('pk').values_list('weight', 'height')),
+            [(Decimal('82.50'), None), (Decimal('81.00'), Decimal('180.00'))],
+        )
+        chart = self.client.get(f'/api/users/{self.member.pk}/measurements/').data
+        self.assertEqual(chart['count'], 2)
+        self.assertEqual([value for _, value in chart['points']], [82.5, 81.0])
+
+    def test_long_history_is_downsampled(self):
+        start = timezone.now() - timedelta(days=5 * 365)
+        values = [80 + 5 * math.sin(day / 30) + (15 if day == 1000 else 0) for day in range(5 * 365)]
+        Measurement.objects.bulk_create([
+            Measurement(user=self.member, measured_at=start + timedelta(days=day), weight=round(value, 2))
+            for day, value in enumerate(values)
+        ])
+        for method in ('lttb', 'minmax'):
+            with self.assertNumQueries(2):
+                chart = self.client.get(f'/api/users/{self.member.pk}/measurements/', {'points': 200, 'method': method}).data
+            points = chart['points']
+            self.assertEqual(chart['count'], len(values))
+            self.assertLessEqual(len(points), 200)
+            self.assertGreater(len(points), 150)
+            self.assertEqual([point[0] for point in points], sorted(point[0] for point in points))
+            self.assertEqual(points[0][1], round(values[0], 2))
+            self.assertEqual(points[-1][1], round(values[-1], 2))
+            # Tek günlük sıçrama seyreltmede kaybolmaz
+            self.assertIn(round(values[1000], 2), [value for _, value in points])
+
+        other = User.objects.create_user('+905557777701', 'pass', first_name='Diğer', last_name='D')
+        self.assertEqual(self.client.get(f'/api/users/{other.pk}/measurements/').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/users/{self.member.pk}/measurements/', {'points': 1}).status_code, 400)
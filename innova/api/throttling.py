@@ -0,0 +1,135 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import permissions
+from rest_framework.throttling import BaseThrottle
+
+# Kapsamlı token bucket kısıtlaması. Durum süreç içinde, boyutu sınırlı bir LRU'da tutulur; kontrol
+# başına tek sözlük erişimi ve birkaç aritmetik işlem yapılır, veritabanına ya da cache'e gidilmez.
+# Oranlar API_THROTTLE_RATES'ten okunur ('10/min' biçiminde; None kapsamı kapatır). Kova kapasitesi
+# oran kadardır: boştaki istemci bir pencere dolusu isteği art arda atabilir, sonra oran hızında dolar.
+# Her worker kendi kovalarını tutar; toplam sınır worker sayısıyla çarpılır.
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    # '10/min' -> (10, 60)
+    if rate is None:
+        return None
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class RateLimiter:
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self.allowed = {}
+        self.rejected = {}
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, scope, ident, num, duration):
+        # İzin verilirse 0, verilmezse bir sonraki jetona kadar beklenecek süreyi (saniye) döndürür
+        key = (scope, ident)
+        rate = num / duration
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (num, now))
+            tokens = min(num, tokens + (now - last) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+                self.allowed[scope] = self.allowed.get(scope, 0) + 1
+            else:
+                wait = (1 - tokens) / rate
+                self.rejected[scope] = self.rejected.get(scope, 0) + 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self.allowed.clear()
+            self.rejected.clear()
+
+    def stats(self):
+        return {
+            'buckets': len(self._buckets),
+            'scopes': {
+                scope: {'allowed': self.allowed.get(scope, 0), 'rejected': self.rejected.get(scope, 0)}
+                for scope in sorted(set(self.allowed) | set(self.rejected))
+            },
+        }
+
+
+limiter = RateLimiter(maxsize=getattr(settings, 'API_THROTTLE_MAX_BUCKETS', 100_000))
+
+
+@receiver(setting_changed)
+def reset_limiter(setting, **kwargs):
+    # override_settings ile oran değişince önceki kovalar geçersizdir
+    if setting == 'API_THROTTLE_RATES':
+        limiter.clear()
+
+
+class BucketThrottle(BaseThrottle):
+    # Alt sınıflar scope'u ve isteğe göre uygulanıp uygulanmayacağını (applies) belirler
+    scope = None
+
+    def __init__(self):
+        self._wait = None
+
+    def get_rate(self):
+        return parse_rate(getattr(settings, 'API_THROTTLE_RATES', {}).get(self.scope))
+
+    def applies(self, request, view):
+        return True
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        rate = self.get_rate()
+        if rate is None or not self.applies(request, view):
+            return True
+        self._wait = limiter.consume(self.scope, self.get_cache_key(request, view), *rate)
+        return not self._wait
+
+    def wait(self):
+        # Retry-After tam saniyedir; DRF değeri aşağı yuvarlar
+        return math.ceil(self._wait) if self._wait else None
+
+
+class LoginThrottle(BucketThrottle):
+    # Kimliksiz uç: istemci adresine göre
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        return f'ip:{self.get_ident(request)}'
+
+
+class ProfileWriteThrottle(BucketThrottle):
+    scope = 'profile_write'
+
+    def applies(self, request, view):
+        return request.method not in permissions.SAFE_METHODS
+
+
+class CatalogReadThrottle(BucketThrottle):
+    scope = 'catalog_read'
+
+    def applies(self, request, view):
+        return request.method in permissions.SAFE_METHODS
+
+
+class StaffBulkThrottle(BucketThrottle):
+    scope = 'staff_bulk'
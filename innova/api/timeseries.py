@@ -0,0 +1,106 @@
+import numpy as np
+from django.db import connections
+from django.db.models import FloatField, Func
+from django.db.models.functions import Cast
+from .models import Measurement
+
+# Ölçüm geçmişinin grafik için seyreltilmesi. Seri (zaman damgası, değer) NumPy dizilerine alınır:
+#   lttb:   Largest-Triangle-Three-Buckets. Kova sınırları ve sonraki kova ortalamaları kümülatif toplamla
+#           tek seferde hesaplanır; döngüde kova başına yalnızca üçgen alanlarının argmax'ı kalır.
+#   minmax: Eşit zaman aralıklı kovalarda en küçük ve en büyük nokta; tamamen vektörel.
+# İki yöntem de ilk ve son noktayı korur ve en fazla `points` nokta döndürür.
+
+FIELDS = ('weight', 'height')
+METHODS = ('lttb', 'minmax')
+
+
+class Epoch(Func):
+    # Unix zamanı (saniye, float). Veritabanında hesaplanır; satır başına datetime ayrıştırması
+    # (SQLite'ta metinden) serinin okunmasından pahalıdır.
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='((julianday(%(expressions)s) - 2440587.5) * 86400.0)', **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='UNIX_TIMESTAMP(%(expressions)s)', **extra_context)
+
+
+def load_series(user, field, since=None, until=None):
+    # Zaman ve değer veritabanında float'a çevrilir; (user, measured_at) indeksi sıralı okunur
+    queryset = Measurement.objects.filter(user=user, **{f'{field}__isnull': False})
+    if since is not None:
+        queryset = queryset.filter(measured_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(measured_at__lte=until)
+    queryset = queryset.order_by('measured_at').values_list(Epoch('measured_at'), Cast(field, FloatField()))
+    # Sütunlar zaten float; Django'nun satır başına dönüştürücüleri atlanıp sonuç doğrudan diziye alınır
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        series = np.array(cursor.fetchall(), dtype=np.float64).reshape(-1, 2)
+    return series[:, 0], series[:, 1]
+
+
+def lttb(x, y, points):
+    # Seçilen noktaların indekslerini döndürür
+    n = len(x)
+    if points >= n or points < 3:
+        return np.arange(n)
+    # Kova i: [edges[i], edges[i + 1]); ilk ve son nokta kendi kovalarındadır
+    edges = (np.floor(np.arange(points - 1) * (n - 2) / (points - 2)) + 1).astype(np.int64)
+    edges[-1] = n - 1
+    x = x - x[0]
+    csx = np.concatenate(([0.0], np.cumsum(x)))
+    csy = np.concatenate(([0.0], np.cumsum(y)))
+    # Kova i için üçgenin üçüncü köşesi: sonraki kovanın ortalaması (son kovada son nokta)
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    counts = next_end - next_start
+    avg_x = (csx[next_end] - csx[next_start]) / counts
+    avg_y = (csy[next_end] - csy[next_start]) / counts
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(x, y, points):
+    n = len(x)
+    if points >= n or points < 4:
+        return np.arange(n)
+    buckets = (points - 2) // 2
+    span = x[-1] - x[0]
+    if span <= 0:
+        return np.array([0, n - 1])
+    bucket = np.minimum(((x - x[0]) / span * buckets).astype(np.int64), buckets - 1)
+    # Kova içinde değere göre sıralanınca ilk eleman en küçük, son eleman en büyük noktadır
+    order = np.lexsort((y, bucket))
+    ordered = bucket[order]
+    first = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    last = np.r_[first[1:] - 1, n - 1]
+    return np.unique(np.concatenate(([0, n - 1], order[first], order[last])))
+
+
+def chart(user, field='weight', points=200, method='lttb', since=None, until=None):
+    x, y = load_series(user, field, since, until)
+    indices = (lttb if method == 'lttb' else minmax)(x, y, points)
+    return {
+        'field': field,
+        'method': method,
+        'count': len(x),
+        # [ISO 8601 zaman, değer] çiftleri
+        'points': [
+            list(point) for point in zip(
+                np.char.add(np.datetime_as_string(np.round(x[indices] * 1000).astype('datetime64[ms]'), unit='ms'), 'Z').tolist(),
+                np.round(y[indices], 2).tolist(),
+            )
+        ],
+    }
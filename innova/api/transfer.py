@@ -0,0 +1,287 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from phonenumber_field.phonenumber import PhoneNumber
+from .models import Movement, Meal, Program, Diet, User, DIET_TOTAL_FIELDS
+from . import versioning
+
+# Katalog ve üye verisinin CSV/JSONL olarak akışla dışa/içe aktarımı.
+# Dışa aktarım .values().iterator(chunk_size) ile okur ve parça parça yazar; tablo hiçbir zaman belleğe alınmaz.
+# İçe aktarım satırları batch_size'lık parçalar halinde doğrular: yabancı anahtar, m2m ve benzersizlik
+# kontrolleri parça başına tek sorgudur, geçerli satırlar bulk_create ile yazılır, hatalı satırlar satır
+# numarasıyla raporlanır ve atlanır.
+
+FORMATS = ('csv', 'jsonl')
+# CSV'de m2m id listesinin ayıracı
+LIST_SEPARATOR = ';'
+
+
+class Resource:
+    def __init__(self, model, fields, m2m=None, read_only=()):
+        self.model = model
+        self.fields = fields
+        self.m2m = m2m
+        self.read_only = tuple(read_only)
+
+    @property
+    def columns(self):
+        return self.fields + ([self.m2m] if self.m2m else [])
+
+    @property
+    def import_columns(self):
+        return [name for name in self.columns if name not in self.read_only]
+
+    def foreign_keys(self):
+        return [name for name in self.fields if self.model._meta.get_field(name).many_to_one]
+
+
+RESOURCES = {
+    'movements': Resource(Movement, ['id', 'name', 'video', 'sets', 'reps']),
+    'meals': Resource(Meal, ['id', 'name', 'amount', 'unit', 'protein', 'carbs', 'oil', 'calories']),
+    'programs': Resource(Program, ['id', 'name'], m2m='movements'),
+    # Toplamlar yemeklerden hesaplanır; dışa aktarılır ama içe aktarımda yok sayılır
+    'diets': Resource(Diet, ['id', *DIET_TOTAL_FIELDS], m2m='meals', read_only=DIET_TOTAL_FIELDS),
+    # Parola dışa aktarılmaz; içe aktarılan üyeler kullanılamaz parolayla oluşturulur
+    'users': Resource(User, [
+        'id', 'phone_number', 'first_name', 'last_name', 'height', 'weight', 'birth_date', 'blood_type',
+        'membership_start', 'membership_end', 'program', 'diet', 'is_staff', 'is_active',
+    ]),
+}
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _through(resource):
+    field = resource.model._meta.get_field(resource.m2m)
+    return field.remote_field.through, f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id'
+
+
+def export_rows(resource, chunk_size=2000):
+    rows = resource.model._default_manager.order_by('pk').values(*resource.fields).iterator(chunk_size=chunk_size)
+    if not resource.m2m:
+        yield from rows
+        return
+    through, source, target = _through(resource)
+    for chunk in _chunks(rows, chunk_size):
+        # Parçadaki tüm m2m bağlantıları tek sorguyla okunur
+        links = defaultdict(list)
+        for owner, related in through.objects.filter(**{f'{source}__in': [row['id'] for row in chunk]}).order_by(
+            source, target,
+        ).values_list(source, target):
+            links[owner].append(related)
+        for row in chunk:
+            row[resource.m2m] = links.get(row['id'], [])
+            yield row
+
+
+class Echo:
+    # csv.writer'ın yazdığı satırı geri döndüren sahte dosya
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return LIST_SEPARATOR.join(str(item) for item in value)
+    return str(value)
+
+
+class TransferEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, PhoneNumber):
+            return str(o)
+        return super().default(o)
+
+
+def export_lines(resource, fmt, chunk_size=2000):
+    # Her parça tek bir metin olarak üretilir; StreamingHttpResponse ve dosya yazımı aynı üreteci kullanır
+    columns = resource.columns
+    if fmt == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(columns)
+        for chunk in _chunks(export_rows(resource, chunk_size), chunk_size):
+            yield ''.join(writer.writerow([_cell(row[name]) for name in columns]) for row in chunk)
+    else:
+        encoder = TransferEncoder(ensure_ascii=False)
+        for chunk in _chunks(export_rows(resource, chunk_size), chunk_size):
+            yield ''.join(encoder.encode({name: row[name] for name in columns}) + '\n' for row in chunk)
+
+
+def read_rows(lines, fmt):
+    # (satır numarası, sözlük ya da hata mesajı) üretir; lines str satırlarından oluşan herhangi bir yineleyicidir
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, 'Invalid JSON.'
+            continue
+        yield number, row if isinstance(row, dict) else 'Expected a JSON object.'
+
+
+class ImportResult:
+    def __init__(self, max_errors=1000):
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'error_count': self.error_count, 'errors': self.errors}
+
+
+def _parse_ids(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, str):
+        value = [part for part in value.split(LIST_SEPARATOR) if part.strip()]
+    if not isinstance(value, list):
+        raise ValueError
+    return [int(item) for item in value]
+
+
+def _build(resource, row):
+    # Tek satırı doğrular; (nesne, fk id'leri, m2m id'leri, hatalar) döndürür. Veritabanına gitmez.
+    model, errors, attrs, foreign, related = resource.model, {}, {}, {}, []
+    fk_names = resource.foreign_keys()
+    for name in resource.import_columns:
+        if name not in row:
+            continue
+        value = row[name]
+        if name == resource.m2m:
+            try:
+                related = _parse_ids(value)
+            except (TypeError, ValueError):
+                errors[name] = ['Expected a list of ids.']
+            continue
+        field = model._meta.get_field(name)
+        if value == '' and (field.null or not field.empty_strings_allowed):
+            value = None
+        if name in fk_names:
+            try:
+                foreign[name] = None if value is None else int(value)
+            except (TypeError, ValueError):
+                errors[name] = [f'Incorrect type. Expected pk value, received {type(value).__name__}.']
+            attrs[field.attname] = foreign.get(name)
+            continue
+        if value is None and (name == 'id' or (not field.null and field.has_default())):
+            continue
+        attrs[name] = value
+
+    instance = model(**attrs)
+    if model is User:
+        instance.set_unusable_password()
+    try:
+        instance.full_clean(exclude=fk_names + list(errors), validate_unique=False, validate_constraints=False)
+    except ValidationError as e:
+        for name, messages in e.message_dict.items():
+            errors.setdefault(name, []).extend(messages)
+    return instance, foreign, related, errors
+
+
+def _missing(model, ids):
+    ids = set(ids)
+    return ids - set(model._default_manager.filter(pk__in=ids).values_list('pk', flat=True))
+
+
+def _import_chunk(resource, chunk, result, batch_size):
+    model = resource.model
+    built = []
+    for line, row in chunk:
+        if isinstance(row, str):
+            result.error(line, {'non_field_errors': [row]})
+            continue
+        built.append((line, *_build(resource, row)))
+
+    # Parça başına toplu kontroller: yabancı anahtarlar, m2m hedefleri, id ve benzersiz alan çakışmaları
+    checks = defaultdict(set)
+    for line, instance, foreign, related, errors in built:
+        for name, pk in foreign.items():
+            if pk is not None:
+                checks[name].add(pk)
+        if resource.m2m:
+            checks[resource.m2m].update(related)
+    missing = {name: _missing(model._meta.get_field(name).related_model, ids) for name, ids in checks.items()}
+
+    unique = [field for field in model._meta.concrete_fields if field.unique]
+    seen, taken = defaultdict(set), {}
+    for field in unique:
+        values = [getattr(instance, field.attname) for _, instance, *_ in built]
+        values = [value for value in values if value not in (None, '')]
+        taken[field.name] = {
+            str(value) for value in model._default_manager.filter(
+                **{f'{field.attname}__in': values}
+            ).values_list(field.attname, flat=True)
+        }
+
+    valid = []
+    for line, instance, foreign, related, errors in built:
+        for name, pk in foreign.items():
+            if pk in missing.get(name, ()):
+                errors[name] = [f'Invalid pk "{pk}" - object does not exist.']
+        bad = sorted(set(related) & missing.get(resource.m2m, set()))
+        if bad:
+            errors[resource.m2m] = [f'Invalid pk "{pk}" - object does not exist.' for pk in bad]
+        for field in unique:
+            value = getattr(instance, field.attname)
+            if value in (None, '') or field.name in errors:
+                continue
+            key = str(value)
+            if key in taken[field.name] or key in seen[field.name]:
+                errors[field.name] = [f'{model._meta.verbose_name} with this {field.verbose_name} already exists.']
+            seen[field.name].add(key)
+        if errors:
+            result.error(line, errors)
+        else:
+            valid.append((instance, related))
+
+    if not valid:
+        return
+    with transaction.atomic():
+        objs = model._default_manager.bulk_create([instance for instance, _ in valid], batch_size=batch_size)
+        if resource.m2m:
+            through, source, target = _through(resource)
+            through.objects.bulk_create(
+                [through(**{source: obj.pk, target: pk}) for obj, (_, related) in zip(objs, valid) for pk in set(related)],
+                batch_size=batch_size,
+            )
+        if model is Diet:
+            Diet.objects.filter(pk__in=[obj.pk for obj in objs]).refresh_totals()
+    result.created += len(objs)
+
+
+def import_rows(resource, rows, batch_size=1000, max_errors=1000):
+    # rows: read_rows çıktısı. Geçerli satırlar parça parça yazılır; hatalı satırlar result.errors'a düşer.
+    result = ImportResult(max_errors=max_errors)
+    for chunk in _chunks(rows, batch_size):
+        _import_chunk(resource, chunk, result, batch_size)
+    if result.created:
+        # Açık id'lerle eklenen satırlardan sonra PostgreSQL dizileri ileri alınır (SQLite'ta boş)
+        models = [resource.model] + ([_through(resource)[0]] if resource.m2m else [])
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+        versioning.bump(resource.model)
+    return result
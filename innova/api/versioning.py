@@ -0,0 +1,53 @@
+import hashlib
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import parse_etags
+from .models import DataVersion
+
+
+def _label(model):
+    return model._meta.label_lower
+
+
+def bump(*models):
+    # Veriyle aynı işlem (transaction) içinde çalışır; böylece sürüm ve veri birlikte commit edilir
+    now = timezone.now()
+    for model in models:
+        label = _label(model)
+        if not DataVersion.objects.filter(pk=label).update(version=F('version') + 1, updated_at=now):
+            DataVersion.objects.get_or_create(label=label, defaults={'version': 1})
+
+
+def _key(labels, rows):
+    # Zaman damgası da anahtara girer; sürüm tablosu sıfırlansa bile eski önbellek girdileri eşleşmez
+    key = ';'.join(
+        f"{label}:{rows[label].version}:{rows[label].updated_at.timestamp()}" if label in rows else f"{label}:0"
+        for label in labels
+    )
+    last_modified = max((row.updated_at for row in rows.values()), default=None)
+    return key, last_modified
+
+
+def current(*models):
+    # (sürüm anahtarı, son değişiklik zamanı) döndürür; tek sorgu
+    labels = sorted(_label(model) for model in models)
+    return _key(labels, {row.label: row for row in DataVersion.objects.filter(pk__in=labels)})
+
+
+async def acurrent(*models):
+    # current'ın async görünümlerde kullanılabilen hali
+    labels = sorted(_label(model) for model in models)
+    return _key(labels, {row.label: row async for row in DataVersion.objects.filter(pk__in=labels)})
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def etag_matches(etag, if_none_match):
+    # If-None-Match zayıf karşılaştırmayla eşleşir; sıkıştırılmış yanıtların ETag'i W/ önekiyle döner
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return etag.removeprefix('W/') in {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
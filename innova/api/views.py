@@ -1,12 +1,35 @@
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
+import codecs
+from datetime import date
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from .models import Movement, Meal, Program, Diet, User
-from .serializers import MovementSerializer, MealSerializer, ProgramSerializer, DietSerializer, UserSerializer
+from .serializers import MovementSerializer, MealSerializer, ProgramSerializer, DietSerializer, UserSerializer, ProgramMovementsSerializer, MembershipSerializer, BulkMembershipSerializer, DietPlanSerializer, MeasurementChartSerializer, nested_versions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import permissions
+from django.db import transaction
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Prefetch
+from rest_framework.decorators import action
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+from .authentication import hash_pool, token_cache
+from .cache import profile_cache, response_cache
+from . import versioning
+from .signals import bulk_operation
+from .filters import OrderingFilter, MembershipFilter
+from .membership import bulk_update_membership
+from .fastpath import compile_mapper
+from .throttling import CatalogReadThrottle, ProfileWriteThrottle, StaffBulkThrottle, limiter
+from .transfer import FORMATS, RESOURCES, export_lines, import_rows, read_rows
+from . import planner
+from . import timeseries
+from . import sync
+from django.conf import settings
+from innova.middleware import accepts_gzip, compress, gzip_min_length, set_compressed, timed
 
 class ReadOnlyIfNotAdminPermission(IsAuthenticated):
     def has_permission(self, request, view):
@@ -34,35 +57,476 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         # Allow users to view/update their own profile
         return obj.id == request.user.id
 
-class MovementViewSet(viewsets.ModelViewSet):
+class ConditionalGetMixin:
+    # Sürüm damgasından ETag/Last-Modified üretir; eşleşen isteklerde queryset ve serializer hiç çalışmaz.
+    # version_models, yanıtın içeriğini etkileyen tüm modelleri (iç içe olanlar dahil) listelemelidir.
+    # JSON yanıtlar ETag anahtarıyla response_cache'te saklanır; ETag veri sürümünü içerdiği için
+    # create/update/delete önbelleği kendiliğinden geçersiz kılar. Anahtar, gövdedeki mutlak next/previous
+    # bağlantıları nedeniyle tam URL'den (şema + host + yol) üretilir.
+    version_models = ()
+    cache_responses = True
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
+
+    def _conditional(self, handler, request, *args, **kwargs):
+        key, last_modified = versioning.current(*self.version_models)
+        # Sayfalama bağlantıları mutlak URL'dir; host ve şema da anahtara girer
+        etag = versioning.make_etag(request.build_absolute_uri(), request.accepted_media_type, key)
+        headers = {'ETag': etag}
+        if last_modified:
+            headers['Last-Modified'] = http_date(last_modified.timestamp())
+
+        if_none_match = request.headers.get('If-None-Match')
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        if if_none_match:
+            not_modified = versioning.etag_matches(etag, if_none_match)
+        else:
+            not_modified = bool(last_modified and if_modified_since and int(last_modified.timestamp()) <= if_modified_since)
+        if not_modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cacheable = self.cache_responses and request.accepted_renderer.format == 'json'
+        if cacheable:
+            compressed = accepts_gzip(request) and response_cache.get(etag, 'gzip')
+            cached = compressed or response_cache.get(etag)
+            if cached is not None:
+                content, cached_headers = cached
+                response = HttpResponse(content)
+                for header, value in cached_headers:
+                    response[header] = value
+                if compressed:
+                    return set_compressed(response, content)
+                return self._cache_compressed(request, response, etag)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+            self._cache_etag = etag if cacheable else None
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, '_cache_etag', None)
+        if etag and isinstance(response, Response):
+            response.render()
+            response_cache.set(etag, response.content, list(response.items()))
+            response = self._cache_compressed(request, response, etag)
+        return response
+
+    def _cache_compressed(self, request, response, etag):
+        # gzip kabul eden istemcilere sıkıştırılmış gövde döner ve önbelleğe konur; sonraki isabetler
+        # yeniden sıkıştırmaz
+        if not accepts_gzip(request) or len(response.content) < gzip_min_length():
+            return response
+        content = compress(response.content)
+        if content is None:
+            return response
+        response_cache.set(etag, content, list(response.items()), 'gzip')
+        return set_compressed(response, content)
+
+class BulkMixin:
+    # POST ile liste gönderildiğinde toplu ekleme, bulk/ üzerinde PATCH (liste) ve DELETE ({"ids": [...]}).
+    # Tüm parti doğrulanır; tek hatada hiçbir şey yazılmaz ve hatalar öğe sırasıyla döner.
+    bulk_max_items = 10_000
+    bulk_batch_size = 500
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        # Liste gönderimi ancak gövde ayrıştırıldıktan sonra anlaşılır; toplu işlem kısıtlaması burada uygulanır
+        throttle = StaffBulkThrottle()
+        if not throttle.allow_request(request, self):
+            self.throttled(request, throttle.wait())
+        error = self._check_bulk_size(request.data)
+        if error:
+            return error
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return self._bulk_errors(serializer.errors)
+        with transaction.atomic():
+            objs = serializer.save()
+            self.bulk_changed([obj.pk for obj in objs], created=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['patch', 'delete'], throttle_classes=[StaffBulkThrottle])
+    def bulk(self, request):
+        if request.method == 'DELETE':
+            return self._bulk_delete(request)
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of items.'}, status=status.HTTP_400_BAD_REQUEST)
+        error = self._check_bulk_size(request.data)
+        if error:
+            return error
+
+        # id'ler pk alanının tipine çevrilir ("5" -> 5); çevrilemeyenler öğe hatası olur
+        pk_field = self.get_queryset().model._meta.pk
+        ids, invalid = {}, set()
+        for index, item in enumerate(request.data):
+            if isinstance(item, dict):
+                try:
+                    ids[index] = pk_field.to_python(item.get('id'))
+                except ValidationError:
+                    invalid.add(index)
+        instances = self.get_queryset().in_bulk([pk for pk in ids.values() if pk is not None])
+        validated, errors, fields = [], [], set()
+        for index, item in enumerate(request.data):
+            if index in invalid:
+                errors.append({'id': ['A valid id is required.']})
+                continue
+            instance = instances.get(ids.get(index))
+            if instance is None:
+                errors.append({'id': ['Object with this id does not exist.']})
+                continue
+            serializer = self.get_serializer(instance, data=item, partial=True)
+            errors.append({} if serializer.is_valid() else serializer.errors)
+            validated.append(serializer)
+        if any(errors):
+            return self._bulk_errors(errors)
+
+        objs, now = [], timezone.now()
+        for serializer in validated:
+            for attr, value in serializer.validated_data.items():
+                setattr(serializer.instance, attr, value)
+                fields.add(attr)
+            # bulk_update auto_now alanlarını kendisi güncellemez
+            serializer.instance.updated_at = now
+            objs.append(serializer.instance)
+        with transaction.atomic():
+            if fields:
+                self.get_queryset().model.objects.bulk_update(objs, sorted(fields | {'updated_at'}), batch_size=self.bulk_batch_size)
+            self.bulk_changed([obj.pk for obj in objs], fields=fields)
+        return Response([serializer.data for serializer in validated])
+
+    def _bulk_delete(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list):
+            return Response({'ids': ['Expected a list of ids.']}, status=status.HTTP_400_BAD_REQUEST)
+        error = self._check_bulk_size(ids)
+        if error:
+            return error
+        try:
+            ids = [self.get_queryset().model._meta.pk.to_python(pk) for pk in ids]
+        except ValidationError:
+            return Response({'ids': ['A valid id is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic(), bulk_operation():
+            queryset = self.get_queryset().filter(pk__in=ids)
+            self.bulk_deleting(queryset)
+            existing = list(queryset.values_list('pk', flat=True))
+            deleted = queryset.delete()[1].get(queryset.model._meta.label, 0)
+            sync.bury(queryset.model, existing)
+            self.bulk_changed(ids, deleted=True)
+        return Response({'deleted': deleted})
+
+    def _check_bulk_size(self, items):
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {'detail': f'At most {self.bulk_max_items} items can be sent at once.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    def _bulk_errors(self, errors):
+        return Response(
+            {'errors': [{'index': index, 'errors': error} for index, error in enumerate(errors) if error]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    def bulk_deleting(self, queryset):
+        pass
+
+    def bulk_changed(self, ids, fields=(), created=False, deleted=False):
+        # Toplu yazmalar sinyal göndermez; sürüm damgası burada artırılır
+        versioning.bump(self.get_queryset().model)
+
+class SparseFieldsMixin:
+    # ?fields=a,b yalnızca bu alanları, ?expand=x,y yalnızca bu ilişkileri iç içe döndürür (bkz. DynamicFieldsMixin).
+    # Okuma isteklerinde queryset de buna göre daraltılır: istenmeyen sütunlar ve ilişkiler yüklenmez.
+    field_columns = {}
+
+    def _query_set_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None or self.request.method not in permissions.SAFE_METHODS:
+            return None
+        return {part.strip() for part in value.split(',') if part.strip()}
+
+    def requested_fields(self):
+        return self._query_set_param('fields')
+
+    def requested_expand(self):
+        return self._query_set_param('expand')
+
+    def wants(self, name):
+        fields = self.requested_fields()
+        return fields is None or name in fields
+
+    def expands(self, name):
+        expand = self.requested_expand()
+        return self.wants(name) and (expand is None or name in expand)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method in permissions.SAFE_METHODS:
+            kwargs.setdefault('fields', self.requested_fields())
+            kwargs.setdefault('expand', self.requested_expand())
+        return super().get_serializer(*args, **kwargs)
+
+    def only_requested(self, queryset):
+        fields = self.requested_fields()
+        if fields is None:
+            return queryset
+        # Sayfalama imleci sıralama sütunlarını okur
+        columns = set(self.ordering_fields)
+        for name in fields:
+            for column in self.field_columns.get(name, [name]):
+                try:
+                    field = queryset.model._meta.get_field(column)
+                except FieldDoesNotExist:
+                    continue
+                if field.concrete and not field.many_to_many:
+                    columns.add(column)
+        return queryset.only(*columns)
+
+class FastReadMixin:
+    # JSON liste isteklerinde serializer yerine .values() satırlarını derlenmiş eşleyiciyle çevirir (bkz. fastpath).
+    # Çıktı serializer ile bayt bayt aynıdır; iç içe serileştirme istenirse ya da tarayıcı API'sinde normal yol çalışır.
+    # fast_read_columns: hesaplanan alanların (model özellikleri) okuduğu sütunlar.
+    fast_read = True
+    fast_read_columns = ()
+
+    def get_fast_mapper(self):
+        if not (self.fast_read and getattr(settings, 'API_FAST_READ_PATH', True)):
+            return None
+        if self.request.accepted_renderer.format != 'json':
+            return None
+        return compile_mapper(self.get_serializer(), self.fast_read_columns)
+
+    def list(self, request, *args, **kwargs):
+        mapper = self.get_fast_mapper()
+        if mapper is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Sayfalama imleci sıralama sütunlarını, model özellikleri de annotate edilen değerleri okur
+        columns = dict.fromkeys(mapper.columns + tuple(queryset.query.annotations))
+        for name in self.ordering_fields:
+            columns.setdefault(name)
+        rows = queryset.values(*columns)
+        page = self.paginate_queryset(rows)
+        with timed('serialize'):
+            data = mapper.map_rows(rows if page is None else page, columns)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+class MovementViewSet(SparseFieldsMixin, BulkMixin, ConditionalGetMixin, FastReadMixin, viewsets.ModelViewSet):
     queryset = Movement.objects.all()
     serializer_class = MovementSerializer
     permission_classes = [ReadOnlyIfNotAdminPermission]
+    throttle_classes = [CatalogReadThrottle]
+    ordering_fields = ['id', 'name']
+    ordering = ['id']
+    version_models = [Movement]
+
+    def get_queryset(self):
+        return self.only_requested(super().get_queryset())
 
-class MealViewSet(viewsets.ModelViewSet):
+    def bulk_deleting(self, queryset):
+        self._affected_programs = list(Program.objects.filter(movements__in=queryset).values_list('pk', flat=True).distinct())
+
+    def bulk_changed(self, ids, fields=(), created=False, deleted=False):
+        super().bulk_changed(ids, fields, created, deleted)
+        if deleted:
+            sync.touch(Program.objects.filter(pk__in=self._affected_programs))
+
+class MealViewSet(SparseFieldsMixin, BulkMixin, ConditionalGetMixin, FastReadMixin, viewsets.ModelViewSet):
     queryset = Meal.objects.all()
     serializer_class = MealSerializer
     permission_classes = [ReadOnlyIfNotAdminPermission]
+    throttle_classes = [CatalogReadThrottle]
+    ordering_fields = ['id', 'name']
+    ordering = ['id']
+    version_models = [Meal]
+
+    def get_queryset(self):
+        return self.only_requested(super().get_queryset())
 
-class ProgramViewSet(viewsets.ModelViewSet):
+    def bulk_deleting(self, queryset):
+        self._affected_diets = list(Diet.objects.filter(meals__in=queryset).values_list('pk', flat=True).distinct())
+
+    def bulk_changed(self, ids, fields=(), created=False, deleted=False):
+        super().bulk_changed(ids, fields, created, deleted)
+        if deleted:
+            Diet.objects.filter(pk__in=self._affected_diets).refresh_totals()
+        elif set(fields) & {'calories', 'protein', 'carbs', 'oil'}:
+            Diet.objects.filter(meals__in=ids).refresh_totals()
+
+class ProgramViewSet(SparseFieldsMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Program.objects.all()
     serializer_class = ProgramSerializer
     permission_classes = [ReadOnlyIfNotAdminPermission]
+    throttle_classes = [CatalogReadThrottle]
+    ordering_fields = ['id', 'name']
+    ordering = ['id']
+    version_models = [Program, Movement]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.wants('movements'):
+            queryset = queryset.prefetch_related('movements')
+        return self.only_requested(queryset)
 
-class DietViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'])
+    def movements(self, request, pk=None):
+        program = self.get_object()
+        serializer = ProgramMovementsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            # add/remove tek INSERT/DELETE ile çalışır ve m2m_changed üzerinden sürümü artırır
+            if serializer.validated_data['remove']:
+                program.movements.remove(*serializer.validated_data['remove'])
+            if serializer.validated_data['add']:
+                program.movements.add(*serializer.validated_data['add'])
+        return Response(ProgramSerializer(Program.objects.prefetch_related('movements').get(pk=program.pk)).data)
+
+class DietViewSet(SparseFieldsMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Diet.objects.all()
     serializer_class = DietSerializer
     permission_classes = [ReadOnlyIfNotAdminPermission]
+    throttle_classes = [CatalogReadThrottle]
+    ordering_fields = ['id']
+    ordering = ['id']
+    version_models = [Diet, Meal]
+    field_columns = {'name': ['total_calories']}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.wants('meals'):
+            queryset = queryset.for_serializer()
+        return self.only_requested(queryset)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def plan(self, request):
+        # Makro hedeflerine en yakın yemek kümelerini önerir (bkz. api.planner); save=true ise en iyisi diyet olarak kaydedilir
+        serializer = DietPlanSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        candidates = planner.plan(
+            planner.load_catalog(),
+            {name: data.get(name) for name in planner.NUTRIENTS},
+            min_meals=data['min_meals'], max_meals=data['max_meals'],
+            exclude=data['exclude'], units=data.get('units'), results=data['results'],
+        )
+        meals = Meal.objects.in_bulk({pk for candidate in candidates for pk in candidate['meal_ids']})
+        for candidate in candidates:
+            candidate['meals'] = MealSerializer([meals[pk] for pk in candidate['meal_ids'] if pk in meals], many=True).data
+        diet = None
+        if data['save'] and candidates:
+            with transaction.atomic():
+                diet = Diet.objects.create()
+                diet.meals.set(candidates[0]['meal_ids'])
+            diet = DietSerializer(Diet.objects.for_serializer().get(pk=diet.pk)).data
+        return Response({'candidates': candidates, 'diet': diet})
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin, FastReadMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [ReadOnlyIfNotAdminPermission]
+    throttle_classes = [ProfileWriteThrottle]
+    filter_backends = [MembershipFilter, OrderingFilter]
+    ordering_fields = ['id', 'membership_end']
+    ordering_aliases = {'remaining_days': 'membership_end'}
+    ordering = ['id']
+    field_columns = {
+        'age': ['birth_date'],
+        'active': ['membership_end'],
+        'remaining_days': ['membership_end'],
+    }
+    fast_read_columns = ('birth_date', 'membership_end')
 
     def get_queryset(self):
+        queryset = User.objects.all()
+        if self.wants('active') or self.wants('remaining_days'):
+            queryset = queryset.with_membership_status()
+        if self.expands('program'):
+            queryset = queryset.select_related('program').prefetch_related('program__movements')
+        if self.expands('diet'):
+            queryset = queryset.prefetch_related(Prefetch('diet', queryset=Diet.objects.for_serializer()))
+        queryset = self.only_requested(queryset)
         if self.request.user.is_staff:
-            return User.objects.all()
-        return User.objects.filter(id=self.request.user.id)
+            return queryset
+        return queryset.filter(id=self.request.user.id)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method in permissions.SAFE_METHODS:
+            context['nested_versions'] = nested_versions(*(
+                serializer_class for name, serializer_class in (('program', ProgramSerializer), ('diet', DietSerializer))
+                if self.expands(name)
+            ))
+        return context
+
+    @action(detail=False, methods=['get'])
+    def me(self, request):
+        # Uygulama açılışındaki tek istek: profil, üyelik durumu, program hareketleri ve diyet yemekleri.
+        # Belge kullanıcı başına önbellekte tutulur; kullanıcı, program/diyet ya da içerdikleri hareket/yemek
+        # satırlarının updated_at değerleri (ve gün) değişince damga değişir ve belge yeniden oluşturulur.
+        stamp = User.objects.profile_stamp(request.user.pk)
+        if stamp is None:
+            raise Http404
+        etag = versioning.make_etag('me', request.user.pk, date.today(), *stamp)
+        if versioning.etag_matches(etag, request.headers.get('If-None-Match')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        cached = profile_cache.get(request.user.pk)
+        if cached is not None and cached[0] == etag:
+            return Response(cached[1], headers={'ETag': etag})
+        user = User.objects.with_membership_status().select_related('program', 'diet').prefetch_related(
+            'program__movements', 'diet__meals',
+        ).get(pk=request.user.pk)
+        data = UserSerializer(user, context=self.get_serializer_context()).data
+        profile_cache.set(request.user.pk, (etag, data))
+        return Response(data, headers={'ETag': etag})
+
+    @action(detail=True, methods=['get'])
+    def measurements(self, request, pk=None):
+        # Boy/kilo geçmişinin en fazla `points` noktaya seyreltilmiş grafiği (bkz. api.timeseries)
+        # get_object iç içe ilişkileri de yükleyeceği için yalnızca erişim kontrolü yapılır
+        queryset = User.objects.only('pk')
+        if not request.user.is_staff:
+            queryset = queryset.filter(pk=request.user.pk)
+        user = get_object_or_404(queryset, pk=pk)
+        serializer = MeasurementChartSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        with timed('serialize'):
+            return Response(timeseries.chart(user, **serializer.validated_data))
+
+    @action(detail=False, methods=['get'])
+    def expiring(self, request):
+        # Resepsiyonun günlük bitiş raporu: membership_end indeksi üzerinde tek sorgu
+        try:
+            days = int(request.query_params.get('days', 7))
+        except ValueError:
+            return Response({'days': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        if days < 0:
+            return Response({'days': ['Must be zero or greater.']}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = User.objects.with_membership_status().expiring_within(days).only(
+            'id', 'phone_number', 'first_name', 'last_name', 'membership_end',
+        )
+        if not request.user.is_staff:
+            queryset = queryset.filter(id=request.user.id)
+        self.ordering = ['membership_end']
+        page = self.paginate_queryset(self.filter_queryset(queryset))
+        return self.get_paginated_response(MembershipSerializer(page, many=True).data)
+
+    @action(detail=False, methods=['post'], url_path='bulk-membership', permission_classes=[IsAdminUser], throttle_classes=[StaffBulkThrottle])
+    def bulk_membership(self, request):
+        serializer = BulkMembershipSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = {key: serializer.validated_data[key] for key in ('extend_days', 'program', 'diet') if key in serializer.validated_data}
+        updated = bulk_update_membership(serializer.get_queryset(), **changes)
+        return Response({'updated': updated})
 
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
@@ -71,3 +535,85 @@ class LogoutView(APIView):
         # Delete the user's token
         request.user.auth_token.delete()
         return Response({"message": "Successfully logged out."}, status=status.HTTP_200_OK)
+
+
+class CacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'token_cache': token_cache.stats(),
+            'response_cache': response_cache.stats(),
+            'profile_cache': profile_cache.stats(),
+            'login': hash_pool.stats(),
+            'throttle': limiter.stats(),
+        })
+
+
+class SyncView(APIView):
+    # GET /api/sync/?since=<imleç>: son imleçten beri değişen ve silinen kayıtlar (bkz. api.sync).
+    # İmleç verilmezse ya da süresi geçmişse tüm veri reset=true ile döner. Yanıtta `next` varsa
+    # ?page=<next> ile sonraki sayfa istenir.
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [CatalogReadThrottle]
+
+    def get(self, request):
+        page = request.query_params.get('page')
+        if page:
+            try:
+                page = sync.decode_page(page)
+            except sync.InvalidCursor:
+                return Response({'page': ['Invalid cursor.']}, status=status.HTTP_400_BAD_REQUEST)
+        since = request.query_params.get('since')
+        if since and not page:
+            try:
+                since = sync.decode_cursor(since)
+            except sync.InvalidCursor:
+                return Response({'since': ['Invalid cursor.']}, status=status.HTTP_400_BAD_REQUEST)
+        payload = sync.changes(request.user, since or None, page or None)
+        for key in ('changes', 'deleted'):
+            if not payload[key]:
+                del payload[key]
+        return Response(payload)
+
+
+class ExportView(APIView):
+    # GET /api/export/<kaynak>.<csv|jsonl>: tablo parça parça okunup akışla yazılır
+    permission_classes = [IsAdminUser]
+    throttle_classes = [StaffBulkThrottle]
+    content_types = {'csv': 'text/csv; charset=utf-8', 'jsonl': 'application/x-ndjson; charset=utf-8'}
+
+    def get(self, request, resource, fmt):
+        if resource not in RESOURCES or fmt not in FORMATS:
+            raise Http404
+        try:
+            chunk_size = min(max(int(request.query_params.get('chunk_size', 2000)), 1), 10_000)
+        except ValueError:
+            return Response({'chunk_size': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(export_lines(RESOURCES[resource], fmt, chunk_size), content_type=self.content_types[fmt])
+        response['Content-Disposition'] = f'attachment; filename="{resource}.{fmt}"'
+        return response
+
+
+class ImportView(APIView):
+    # POST /api/import/<kaynak>.<csv|jsonl>: gövde ham dosya ya da multipart "file" alanı olabilir.
+    # Geçerli satırlar yazılır; hatalı satırlar satır numarasıyla döner. Hiçbir satır yazılamazsa 400.
+    permission_classes = [IsAdminUser]
+    throttle_classes = [StaffBulkThrottle]
+
+    def post(self, request, resource, fmt):
+        if resource not in RESOURCES or fmt not in FORMATS:
+            raise Http404
+        if request.content_type.startswith('multipart/'):
+            source = request.FILES.get('file')
+            if source is None:
+                return Response({'file': ['No file was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            # Gövde belleğe alınmadan satır satır okunur
+            source = request._request
+        try:
+            result = import_rows(RESOURCES[resource], read_rows(codecs.iterdecode(source, 'utf-8-sig'), fmt))
+        except UnicodeDecodeError:
+            return Response({'detail': 'File must be UTF-8 encoded.'}, status=status.HTTP_400_BAD_REQUEST)
+        failed = result.error_count and not result.created
+        return Response(result.as_dict(), status=status.HTTP_400_BAD_REQUEST if failed else status.HTTP_200_OK)
@@ -0,0 +1,221 @@
+import cProfile
+import heapq
+import json
+import logging
+import os
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from gzip import GzipFile
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware, re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.text import StreamingBuffer, compress_string
+
+logger = logging.getLogger('innova.requests')
+
+_metrics = ContextVar('innova_request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self, keep_slowest=5):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.slowest = []
+        self.keep_slowest = keep_slowest
+        self.timings = {}
+
+    def add(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def query_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.sql_time += duration
+            # En yavaş N sorgu küçük bir min-heap'te tutulur
+            if len(self.slowest) < self.keep_slowest:
+                heapq.heappush(self.slowest, (duration, sql))
+            elif duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (duration, sql))
+
+
+@contextmanager
+def timed(name):
+    # Etkin istek varsa bloğun süresini o isteğin Server-Timing değerine ekler
+    metrics = _metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(name, time.perf_counter() - started)
+
+
+class RequestTimingMiddleware:
+    # Her istek için sorgu sayısı, SQL süresi, auth/serializer süresi ve toplam süreyi Server-Timing
+    # başlığı olarak ekler. Eşiği aşan istekler yapılandırılmış log olarak yazılır; profil modu açıksa
+    # örneklenen istekler cProfile ile çalıştırılır ve yavaş olanların istatistikleri diske dökülür.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        config = getattr(settings, 'REQUEST_TIMING', {})
+        self.slow_ms = config.get('SLOW_REQUEST_MS', 500)
+        self.profile_rate = config.get('PROFILE_SAMPLE_RATE', 0.0)
+        self.profile_dir = config.get('PROFILE_DIR')
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        profiler = None
+        if self.profile_rate and self.profile_dir and random.random() < self.profile_rate:
+            profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            with _wrap_connections(metrics):
+                if profiler is not None:
+                    response = profiler.runcall(self.get_response, request)
+                else:
+                    response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        total = time.perf_counter() - started
+
+        response['Server-Timing'] = self.server_timing(metrics, total)
+        if total * 1000 >= self.slow_ms:
+            self.log_slow_request(request, response, metrics, total, profiler)
+        return response
+
+    async def __acall__(self, request):
+        # ORM çağrıları async görünümlerde ayrı bir thread'de çalıştığı için burada SQL ölçülmez
+        metrics = RequestMetrics()
+        metrics.queries = None
+        token = _metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        total = time.perf_counter() - started
+        response['Server-Timing'] = self.server_timing(metrics, total)
+        if total * 1000 >= self.slow_ms:
+            self.log_slow_request(request, response, metrics, total, None)
+        return response
+
+    def server_timing(self, metrics, total):
+        parts = []
+        if metrics.queries is not None:
+            parts.append(f'db;dur={metrics.sql_time * 1000:.2f};desc="{metrics.queries} queries"')
+        parts += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in metrics.timings.items()]
+        parts.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(parts)
+
+    def log_slow_request(self, request, response, metrics, total, profiler):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'user_id': getattr(getattr(request, 'user', None), 'pk', None),
+            'total_ms': round(total * 1000, 2),
+            'queries': metrics.queries,
+            'sql_ms': round(metrics.sql_time * 1000, 2),
+            'timings_ms': {name: round(seconds * 1000, 2) for name, seconds in metrics.timings.items()},
+            'slowest_sql': [
+                {'ms': round(duration * 1000, 2), 'sql': sql}
+                for duration, sql in sorted(metrics.slowest, reverse=True)
+            ],
+        }
+        if profiler is not None:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            path = os.path.join(self.profile_dir, f'{int(time.time() * 1000)}-{request.method}-{request.path.strip("/").replace("/", "_")}.prof')
+            profiler.dump_stats(path)
+            record['profile'] = path
+        logger.warning(json.dumps(record, ensure_ascii=False), extra={'request_metrics': record})
+
+
+def accepts_gzip(request):
+    return bool(re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+
+
+def gzip_min_length():
+    return getattr(settings, 'GZIP_MIN_LENGTH', 1024)
+
+
+def compress(content):
+    # Gövdeyi CompressionMiddleware ile aynı biçimde sıkıştırır; kazanç yoksa None döner
+    compressed = compress_string(content, max_random_bytes=GZipMiddleware.max_random_bytes)
+    return compressed if len(compressed) < len(content) else None
+
+
+def compress_sequence(sequence):
+    # django.utils.text.compress_sequence'tan farkı: her parçadan sonra flush edilir; zlib tamponu dolmasını
+    # beklemeden parça istemciye gider ve istemci o ana kadar gelen veriyi açabilir
+    buf = StreamingBuffer()
+    with GzipFile(mode='wb', compresslevel=6, fileobj=buf, mtime=0) as zfile:
+        yield buf.read()
+        for item in sequence:
+            if not item:
+                continue
+            zfile.write(item)
+            zfile.flush()
+            yield buf.read()
+    yield buf.read()
+
+
+def _mark_compressed(response):
+    response['Content-Encoding'] = 'gzip'
+    # Gövde baytları değiştiği için ETag zayıflatılır (GZipMiddleware ile aynı)
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
+
+
+def set_compressed(response, content):
+    # Önceden sıkıştırılmış gövdeyi yanıta koyar; Content-Encoding olduğu için middleware tekrar sıkıştırmaz
+    response.content = content
+    response['Content-Length'] = str(len(content))
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return _mark_compressed(response)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    # Accept-Encoding: gzip isteyen istemcilere gzip. Django'nun GZipMiddleware'inden farkları:
+    # eşik ayarlanabilir (GZIP_MIN_LENGTH; küçük JSON gövdelerinde sıkıştırma kazançtan pahalıdır) ve
+    # StreamingHttpResponse (ör. dışa aktarım) her parçadan sonra flush edilerek sıkıştırılır.
+    # Görünümler önbellekteki sıkıştırılmış gövdeyi set_compressed ile doğrudan döndürebilir.
+    def process_response(self, request, response):
+        if not response.streaming:
+            if len(response.content) < gzip_min_length():
+                return response
+            return super().process_response(request, response)
+        if response.is_async or response.has_header('Content-Encoding'):
+            return super().process_response(request, response)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not accepts_gzip(request):
+            return response
+        response.streaming_content = compress_sequence(response.streaming_content)
+        del response.headers['Content-Length']
+        return _mark_compressed(response)
+
+
+def _wrap_connections(metrics):
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(metrics.query_wrapper))
+    return stack
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'innova.middleware.RequestTimingMiddleware',
+    'innova.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,11 +81,58 @@ WSGI_APPLICATION = 'innova.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Veritabanı profili ortam değişkenleriyle seçilir: DB_ENGINE=sqlite (varsayılan) ya da postgresql
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DB_POOL = os.environ.get('DB_POOL', '').lower() in ('1', 'true')
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'innova'),
+            'USER': os.environ.get('DB_USER', 'innova'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Havuz (psycopg 3 + psycopg_pool) kullanılıyorsa kalıcı bağlantı kapatılmalıdır
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                    'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+                },
+            } if DB_POOL else {},
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'OPTIONS': {
+                # Yazma kilidi işlem başında alınır; okuma->yazma yükseltmesinde "database is locked" olmaz
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)) / 1000,
+            },
+            # WAL ve eşzamanlılık testleri için test veritabanı da dosyada tutulur
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
+        }
+    }
+
+# api.signals içindeki connection_created işleyicisi her yeni SQLite bağlantısında uygular
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),
+    'temp_store': 'MEMORY',
 }
 
 
@@ -132,11 +182,97 @@ PHONENUMBER_DEFAULT_REGION = 'TR'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'api.filters.OrderingFilter',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', 50)),
+    # İstemci adresi (LoginThrottle) için güvenilen ters proxy sayısı; 0 ise X-Forwarded-For yok sayılır
+    # ve REMOTE_ADDR kullanılır. Proxy arkasında proxy sayısı kadar verilmelidir.
+    'NUM_PROXIES': int(os.environ.get('API_NUM_PROXIES', 0)),
+}
+
+# İstek süresi ölçümü: Server-Timing başlığı, yavaş istek logu ve örneklemeli cProfile
+REQUEST_TIMING = {
+    'SLOW_REQUEST_MS': int(os.environ.get('SLOW_REQUEST_MS', 500)),
+    'PROFILE_SAMPLE_RATE': float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+    'PROFILE_DIR': os.environ.get('PROFILE_DIR', BASE_DIR / 'profiles'),
 }
 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'innova.requests': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Bu boyutun (bayt) altındaki yanıtlar sıkıştırılmaz
+GZIP_MIN_LENGTH = int(os.environ.get('GZIP_MIN_LENGTH', 1024))
+
+# Token -> kullanıcı önbelleği. Süreç içi önbellek yalnızca kendi sürecinde geçersiz kılınır; birden
+# fazla worker varsa paylaşılan bir cache takma adı verilmeli (o zaman süreç içi katman kullanılmaz).
+API_TOKEN_CACHE_SIZE = 10_000
+API_TOKEN_CACHE_TTL = 60
+API_TOKEN_CACHE_BACKEND = None
+
+# api/token/: eşzamanlı parola doğrulaması sınırı (varsayılan: min(4, CPU)) ve bekleyebilecek giriş sayısı
+API_LOGIN_CONCURRENCY = int(os.environ.get('API_LOGIN_CONCURRENCY', 0)) or None
+API_LOGIN_QUEUE_LIMIT = int(os.environ.get('API_LOGIN_QUEUE_LIMIT', 200))
+
+# Kapsam başına istek oranı (token bucket, bkz. api.throttling); None kapsamı kapatır. Sınırlar worker başınadır.
+API_THROTTLE_RATES = {
+    'login': os.environ.get('API_THROTTLE_LOGIN', '10/min'),
+    'profile_write': os.environ.get('API_THROTTLE_PROFILE_WRITE', '30/min'),
+    'catalog_read': os.environ.get('API_THROTTLE_CATALOG_READ', '1200/min'),
+    'staff_bulk': os.environ.get('API_THROTTLE_STAFF_BULK', '30/min'),
+}
+API_THROTTLE_MAX_BUCKETS = 100_000
+
+# Katalog yanıt önbelleği (render edilmiş JSON gövdeleri)
+API_RESPONSE_CACHE_BACKEND = 'default'
+API_RESPONSE_CACHE_TTL = 3600
+
+# İç içe Program/Diet çıktıları için istekler arası LRU (girdi sayısı); 0 kapalı. Açıkken istek başına
+# bir sürüm sorgusu eklenir.
+API_NESTED_CACHE_SIZE = int(os.environ.get('API_NESTED_CACHE_SIZE', 0))
+API_NESTED_CACHE_TTL = 3600
+
+# /api/users/me/ profil belgesi önbelleği (kullanıcı sayısı, saniye)
+API_PROFILE_CACHE_SIZE = int(os.environ.get('API_PROFILE_CACHE_SIZE', 10_000))
+API_PROFILE_CACHE_TTL = 3600
+
+# Bu satır sayısının üzerindeki filtresiz tablolarda X-Total-Count tahmini verilir
+API_COUNT_ESTIMATE_THRESHOLD = 100_000
+
+# Liste uçlarında .values() tabanlı hızlı okuma yolu (serializer çıktısıyla aynı)
+API_FAST_READ_PATH = os.environ.get('API_FAST_READ_PATH', '1') == '1'
+
+# api/sync/: silme kayıtlarının saklanma süresi (gün; daha eski imleçler tam veri alır),
+# commit gecikmesine karşı imlecin geriye kaydırılacağı süre (saniye) ve sayfa başına model satırı
+API_SYNC_TOMBSTONE_DAYS = 90
+API_SYNC_OVERLAP = 5
+API_SYNC_PAGE_SIZE = int(os.environ.get('API_SYNC_PAGE_SIZE', 1000))
+
 AUTH_USER_MODEL = 'api.User'
+
+# Testlerde kısıtlama kapalıdır (bkz. innova.test_runner)
+TEST_RUNNER = 'innova.test_runner.TestRunner'
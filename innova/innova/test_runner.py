@@ -0,0 +1,27 @@
+import logging
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    # Kısıtlama kovaları süreç içinde tutulduğundan testler arasında taşınırdı; test süresince tüm
+    # kapsamlar kapatılır. Kısıtlamayı sınayan testler oranları override_settings ile verir.
+    # Yavaş istek logu (innova.requests) konsola basılmaz; onu sınayan testler assertLogs kullanır.
+    quiet_loggers = ('innova.requests',)
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._unthrottled = override_settings(API_THROTTLE_RATES=dict.fromkeys(settings.API_THROTTLE_RATES))
+        self._unthrottled.enable()
+        self._handlers = {}
+        for name in self.quiet_loggers:
+            logger = logging.getLogger(name)
+            self._handlers[name] = logger.handlers
+            logger.handlers = [logging.NullHandler()]
+
+    def teardown_test_environment(self, **kwargs):
+        for name, handlers in self._handlers.items():
+            logging.getLogger(name).handlers = handlers
+        self._unthrottled.disable()
+        super().teardown_test_environment(**kwargs)
@@ -17,8 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from api.views import MovementViewSet, MealViewSet, ProgramViewSet, DietViewSet, UserViewSet, LogoutView
-from rest_framework.authtoken.views import obtain_auth_token
+from api.views import MovementViewSet, MealViewSet, ProgramViewSet, DietViewSet, UserViewSet, LogoutView, CacheStatsView, SyncView, ExportView, ImportView
+from api import async_views
 
 router = DefaultRouter()
 router.register(r'movements', MovementViewSet)
@@ -27,10 +27,28 @@ router.register(r'programs', ProgramViewSet)
 router.register(r'diets', DietViewSet)
 router.register(r'users', UserViewSet)
 
+async_routes = [
+    ('movements', async_views.AsyncMovementView),
+    ('meals', async_views.AsyncMealView),
+    ('programs', async_views.AsyncProgramView),
+    ('diets', async_views.AsyncDietView),
+    ('users', async_views.AsyncUserView),
+]
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api-auth/', include('rest_framework.urls')),
-    path('api/token/', obtain_auth_token, name='api_token_auth'),
+    path('api/token/', async_views.AsyncTokenView.as_view(), name='api_token_auth'),
     path('api/logout/', LogoutView.as_view(), name='logout'),
+    path('api/cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path('api/sync/', SyncView.as_view(), name='sync'),
+    path('api/export/<slug:resource>.<slug:fmt>', ExportView.as_view(), name='export'),
+    path('api/import/<slug:resource>.<slug:fmt>', ImportView.as_view(), name='import'),
+] + [
+    path(f'api/async/{prefix}/', view.as_view(), name=f'async-{prefix}-list')
+    for prefix, view in async_routes
+] + [
+    path(f'api/async/{prefix}/<int:pk>/', view.as_view(), name=f'async-{prefix}-detail')
+    for prefix, view in async_routes
 ]